@@ -3,11 +3,17 @@
 # Run: pip install pygame
 # Then: python minesweeper.py
 
+import time
+_T0 = time.perf_counter()  # import -> first frame timing, see gameloop.report_startup
+
 import pygame
 import sys
 import random
 from collections import deque
 
+import fonts
+import gameloop
+
 # ----------------- CONFIG -----------------
 CELL_SIZE = 28         # pixel size of each cell
 GRID_W = 16            # number of columns
@@ -37,16 +43,20 @@ NUM_COLORS = {
     8: (80, 80, 80),
 }
 
-pygame.init()
-CLOCK = pygame.time.Clock()
-FONT = pygame.font.SysFont(FONT_NAME, 18)
-SMALL_FONT = pygame.font.SysFont(FONT_NAME, 14)
-
 WIDTH = GRID_W * CELL_SIZE + WINDOW_PADDING * 2
 HEIGHT = GRID_H * CELL_SIZE + 100  # extra for info area
+CAPTION = "Minesweeper - Python (Pygame)"
 
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Minesweeper - Python (Pygame)")
+# Fonts are created on first use so that importing this file (bots, benchmarks)
+# does not need a display or the font module.
+FONT = None
+SMALL_FONT = None
+
+def init_fonts():
+    global FONT, SMALL_FONT
+    if FONT is None:
+        FONT = fonts.sys_font(FONT_NAME, 18)
+        SMALL_FONT = fonts.sys_font(FONT_NAME, 14)
 
 # ----------------- Game logic classes -----------------
 class Cell:
@@ -118,7 +128,8 @@ class Board:
         if self.first_click:
             self.place_mines(r, c)
             self.first_click = False
-            self.start_time = pygame.time.get_ticks()
+            # not pygame.time.get_ticks(): it stays 0 unless pygame.init() was called
+            self.start_time = time.monotonic()
 
         # if it's a mine -> game over
         if cell.mine:
@@ -196,23 +207,23 @@ class Board:
         return cnt
 
     def update_time(self):
-        if self.start_time and not self.game_over:
-            self.elapsed = (pygame.time.get_ticks() - self.start_time) // 1000
+        if self.start_time is not None and not self.game_over:
+            self.elapsed = int(time.monotonic() - self.start_time)
 
     def reset(self):
         self.__init__(self.w, self.h, self.mines)
 
 
 # ----------------- Drawing -----------------
-def draw_board(board):
-    SCREEN.fill(BG)
+def draw_board(surface, board):
+    surface.fill(BG)
     # Info panel
-    pygame.draw.rect(SCREEN, GRID_BG, (0, 0, WIDTH, 60))
+    pygame.draw.rect(surface, GRID_BG, (0, 0, WIDTH, 60))
     mines_left = max(0, board.mines - board.flagged_count())
     txt_mines = FONT.render(f"Mines: {mines_left}", True, TEXT_COLOR)
     txt_time = FONT.render(f"Time: {board.elapsed}s", True, TEXT_COLOR)
-    SCREEN.blit(txt_mines, (20, 18))
-    SCREEN.blit(txt_time, (WIDTH - 120, 18))
+    surface.blit(txt_mines, (20, 18))
+    surface.blit(txt_time, (WIDTH - 120, 18))
 
     # Message if game over
     if board.game_over:
@@ -221,7 +232,7 @@ def draw_board(board):
         else:
             msg = "Boom! You Lose. Press R to restart."
         txt = FONT.render(msg, True, TEXT_COLOR)
-        SCREEN.blit(txt, (WIDTH // 2 - txt.get_width() // 2, 18))
+        surface.blit(txt, (WIDTH // 2 - txt.get_width() // 2, 18))
 
     # grid
     grid_x = WINDOW_PADDING
@@ -233,27 +244,27 @@ def draw_board(board):
             cell = board.cells[r][c]
 
             rect = pygame.Rect(x, y, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(SCREEN, (100, 100, 100), rect, 1)  # border
+            pygame.draw.rect(surface, (100, 100, 100), rect, 1)  # border
 
             if cell.open:
-                pygame.draw.rect(SCREEN, CELL_OPEN, rect)
+                pygame.draw.rect(surface, CELL_OPEN, rect)
                 if cell.mine:
-                    pygame.draw.circle(SCREEN, MINE_COLOR, rect.center, CELL_SIZE // 3)
+                    pygame.draw.circle(surface, MINE_COLOR, rect.center, CELL_SIZE // 3)
                 elif cell.adj > 0:
                     color = NUM_COLORS.get(cell.adj, TEXT_COLOR)
                     num_s = FONT.render(str(cell.adj), True, color)
-                    SCREEN.blit(num_s, (x + CELL_SIZE // 2 - num_s.get_width() // 2,
-                                        y + CELL_SIZE // 2 - num_s.get_height() // 2))
+                    surface.blit(num_s, (x + CELL_SIZE // 2 - num_s.get_width() // 2,
+                                         y + CELL_SIZE // 2 - num_s.get_height() // 2))
             else:
-                pygame.draw.rect(SCREEN, CELL_COVER, rect)
+                pygame.draw.rect(surface, CELL_COVER, rect)
                 if cell.flag:
                     # small flag triangle
                     px = x + CELL_SIZE // 4
                     py = y + CELL_SIZE // 4
                     points = [(px, py + CELL_SIZE // 2), (px, py), (px + CELL_SIZE // 2, py + CELL_SIZE // 3)]
-                    pygame.draw.polygon(SCREEN, FLAG_COLOR, points)
+                    pygame.draw.polygon(surface, FLAG_COLOR, points)
                     # flag pole
-                    pygame.draw.line(SCREEN, (80, 80, 80), (px, py + CELL_SIZE // 2), (px, py - CELL_SIZE // 4), 2)
+                    pygame.draw.line(surface, (80, 80, 80), (px, py + CELL_SIZE // 2), (px, py - CELL_SIZE // 4), 2)
 
 
 # ----------------- Utilities -----------------
@@ -268,45 +279,68 @@ def pixel_to_cell(mx, my):
         return (cy, cx)
     return None
 
-# ----------------- Main loop -----------------
-def main():
-    board = Board(GRID_W, GRID_H, MINES)
-    running = True
-
-    while running:
-        CLOCK.tick(FPS)
-        board.update_time()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                break
-
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    board.reset()
-
-            elif event.type == pygame.MOUSEBUTTONDOWN and not board.game_over:
-                pos = pygame.mouse.get_pos()
-                cell_coords = pixel_to_cell(*pos)
-                if not cell_coords:
-                    continue
-                r, c = cell_coords
-                if event.button == 1:  # left click
-                    # if open number and both buttons? we'll support chord with shift-click
-                    mods = pygame.key.get_mods()
-                    if board.cells[r][c].open and mods & pygame.KMOD_SHIFT:
-                        board.chord(r, c)
-                    else:
-                        board.reveal(r, c)
-                elif event.button == 3:  # right click
-                    board.toggle_flag(r, c)
-                elif event.button == 2:  # middle click -> chord
+# ----------------- Scene -----------------
+class MinesweeperScene:
+    """Board wrapped for gameloop.run.
+
+    The board only changes on input. While the timer runs the scene is active, but
+    its step is the loop's idle tick, so gameloop.run stays at IDLE_FPS instead of
+    FPS; it only redraws when the shown second changes.
+    """
+
+    step = 1 / gameloop.IDLE_FPS
+
+    def __init__(self, board=None):
+        init_fonts()
+        self.board = board or Board(GRID_W, GRID_H, MINES)
+        self.running = True
+        self.dirty = True
+
+    @property
+    def active(self):
+        return self.board.start_time is not None and not self.board.game_over
+
+    def handle_event(self, event):
+        board = self.board
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_r:
+                board.reset()
+                self.dirty = True
+
+        elif event.type == pygame.MOUSEBUTTONDOWN and not board.game_over:
+            cell_coords = pixel_to_cell(*event.pos)
+            if not cell_coords:
+                return
+            r, c = cell_coords
+            if event.button == 1:  # left click
+                # if open number and both buttons? we'll support chord with shift-click
+                mods = pygame.key.get_mods()
+                if board.cells[r][c].open and mods & pygame.KMOD_SHIFT:
                     board.chord(r, c)
+                else:
+                    board.reveal(r, c)
+            elif event.button == 3:  # right click
+                board.toggle_flag(r, c)
+            elif event.button == 2:  # middle click -> chord
+                board.chord(r, c)
+            self.dirty = True
+
+    def update(self, dt):
+        elapsed = self.board.elapsed
+        self.board.update_time()
+        if self.board.elapsed != elapsed:
+            self.dirty = True
+
+    def render(self, surface, alpha):
+        draw_board(surface, self.board)
+        self.dirty = False
 
-        draw_board(board)
-        pygame.display.flip()
-
+# ----------------- Main loop -----------------
+def main():
+    # show the window first, then load fonts and build the scene
+    gameloop.open_display((WIDTH, HEIGHT), CAPTION)
+    scene = MinesweeperScene()
+    gameloop.run(scene, (WIDTH, HEIGHT), CAPTION, fps=FPS, started=_T0)
     pygame.quit()
     sys.exit()
 
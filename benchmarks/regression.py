@@ -0,0 +1,400 @@
+# benchmarks/regression.py
+# Bộ đo hiệu năng các phần lõi của game, chạy không cần cửa sổ (SDL dummy driver).
+#
+# Mỗi kịch bản chạy ở nhiều kích thước tăng dần; với mỗi kích thước đo:
+#   time_ms   - thời gian một lần chạy: min của ít nhất --repeat lần và đủ MIN_MEASURE_S giây
+#               (không tính bước chuẩn bị)
+#   peak_kib  - bộ nhớ cấp phát đỉnh trong một lần chạy (tracemalloc, đo riêng)
+# rồi in đường cong tăng theo kích thước: số mũ k trong time ~ size^k so với kích thước trước.
+#
+# Kết quả được so với baseline (mặc định benchmarks/baseline.json); thoát với mã 1 nếu có
+# kịch bản chậm hơn / tốn bộ nhớ hơn quá ngưỡng. Để bớt phụ thuộc máy (và máy ảo lúc nhanh
+# lúc chậm), tốc độ máy được ước lượng từ chính các kịch bản: median của tỉ lệ (thời gian lần
+# này / baseline) ở kích thước lớn nhất của mọi kịch bản, đo trong cùng lần chạy (chạy một phần
+# kịch bản thì vẫn đo thêm các điểm tham chiếu này). Mỗi kịch bản được so với baseline đã nhân
+# theo tỉ lệ đó, nên chỉ kịch bản chậm đi so với phần còn lại mới bị báo. Khi một thay đổi cố ý
+# làm đổi hiệu năng, ghi lại baseline bằng --update-baseline.
+#
+#   python benchmarks/regression.py                     # chạy hết, so với baseline
+#   python benchmarks/regression.py snake.move rain.update
+#   python benchmarks/regression.py --update-baseline
+#   python benchmarks/regression.py --list
+
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import game_scripts  # noqa: E402
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+TIME_TOLERANCE = 0.50     # chậm hơn baseline quá 50% -> hồi quy (đo trên máy ảo dao động khá mạnh)
+MEMORY_TOLERANCE = 0.10
+TIME_FLOOR_MS = 0.2       # chênh lệch nhỏ hơn mức này coi là nhiễu
+MEMORY_FLOOR_KIB = 16
+MIN_MEASURE_S = 0.3       # đo lặp tới ít nhất chừng này giây để min ít bị nhiễu
+MAX_RUNS = 50
+RECHECKS = 2              # đo lại các chỗ chậm vài lần trước khi kết luận là hồi quy
+
+
+class Scenario:
+    """Một kịch bản: setup(size) dựng trạng thái (không tính giờ), run(state) là phần được đo."""
+
+    def __init__(self, name, unit, sizes, setup, run):
+        self.name = name
+        self.unit = unit    # ý nghĩa của size, để in bảng
+        self.sizes = sizes
+        self.setup = setup
+        self.run = run
+
+
+# ----------------- minesweeper -----------------
+MINE_DENSITY = 0.15
+
+
+def board_setup(side):
+    ms = game_scripts.load("minesweeper")
+    random.seed(side)  # place_mines dùng module random
+    return ms.Board(side, side, int(side * side * MINE_DENSITY))
+
+
+def place_mines_run(board):
+    board.place_mines(board.h // 2, board.w // 2)
+
+
+def reveal_setup(side):
+    # mìn đặt sẵn ngoài phần đo; phần đo mở lần lượt mọi ô không có mìn (loang + kiểm tra thắng)
+    board = board_setup(side)
+    place_mines_run(board)
+    board.first_click = False
+    safe = [(r, c) for r in range(board.h) for c in range(board.w) if not board.cells[r][c].mine]
+    return board, safe
+
+
+def reveal_run(state):
+    board, safe = state
+    for r, c in safe:
+        board.reveal(r, c)
+
+
+# ----------------- snake -----------------
+SNAKE_GRID = (256, 256)
+SNAKE_MOVES = 20000
+FOOD_PICKS = 20000
+
+
+def serpentine(snake):
+    """Hướng tiếp theo để rắn bò zig-zag hết hàng này sang hàng dưới, không tự cắn."""
+    columns = snake.columns
+    x, _ = snake.head()
+    dx, dy = snake.direction
+    if dy:
+        return (-1, 0) if x == columns - 1 else (1, 0)
+    if (dx == 1 and x == columns - 1) or (dx == -1 and x == 0):
+        return (0, 1)
+    return snake.direction
+
+
+def snake_setup(length):
+    snake_mod = game_scripts.load("snake")
+    snake = snake_mod.Snake(*SNAKE_GRID)
+    snake.grow(length - len(snake.positions))
+    while len(snake.positions) < length:
+        snake.direction = serpentine(snake)
+        snake.move()
+    return snake_mod, snake
+
+
+def snake_move_run(state):
+    _, snake = state
+    for _ in range(SNAKE_MOVES):
+        snake.direction = serpentine(snake)
+        snake.move()
+
+
+def food_setup(length):
+    snake_mod, snake = snake_setup(length)
+    food = snake_mod.Food(snake, random.Random(length))
+    return food, snake
+
+
+def food_run(state):
+    food, snake = state
+    for _ in range(FOOD_PICKS):
+        food.random_pos(snake)
+
+
+# ----------------- flappy -----------------
+FLAPPY_TICKS = 100
+
+
+def flappy_setup(pipes):
+    flappy = game_scripts.load("flappy")
+    state = flappy.reset_game(seed=pipes)
+    # ống xếp cách nhau 200px từ mép phải trở đi, đủ để không ống nào bị xóa trong lúc đo
+    state["pipes"] = [flappy.create_pipe(state["rng"]) for _ in range(pipes)]
+    for i, pipe in enumerate(state["pipes"]):
+        pipe["x"] += i * 200
+    return flappy, state
+
+
+def flappy_run(state):
+    flappy, game = state
+    for _ in range(FLAPPY_TICKS):
+        if game["tick"] % 20 == 0:
+            flappy.flap(game)
+        flappy.step(game)
+
+
+# ----------------- rain -----------------
+RAIN_SIZE = (1920, 1080)
+RAIN_FRAMES = 20
+
+
+def rain_setup(count):
+    import numpy as np
+    import particles
+    return particles.RainField(count, *RAIN_SIZE, (0, 200, 255), np.random.default_rng(count))
+
+
+def rain_update_run(rain):
+    for _ in range(RAIN_FRAMES):
+        rain.update()
+
+
+def rain_draw_setup(count):
+    import pygame
+    return rain_setup(count), pygame.Surface(RAIN_SIZE)
+
+
+def rain_draw_run(state):
+    rain, surface = state
+    for _ in range(RAIN_FRAMES):
+        rain.draw(surface)
+
+
+# ----------------- calc_gui -----------------
+EVALS = 50
+
+
+def safe_eval_setup(terms):
+    # calc_gui import tkinter ở đầu file (không mở cửa sổ); máy không có tkinter thì bỏ qua
+    try:
+        calc = game_scripts.load("calc_gui")
+    except ImportError:
+        return None
+    expr = " + ".join(f"sqrt({i + 1}) * 2 - {i} / 3 ** 2" for i in range(terms))
+    return calc.safe_eval, expr
+
+
+def safe_eval_run(state):
+    safe_eval, expr = state
+    for _ in range(EVALS):
+        safe_eval(expr)
+
+
+SCENARIOS = {s.name: s for s in [
+    Scenario("minesweeper.place_mines", "cạnh bàn", [16, 32, 64, 128], board_setup, place_mines_run),
+    Scenario("minesweeper.reveal", "cạnh bàn", [16, 32, 64, 128], reveal_setup, reveal_run),
+    Scenario("snake.move", "độ dài rắn", [100, 1000, 10000, 30000], snake_setup, snake_move_run),
+    Scenario("snake.random_pos", "độ dài rắn", [100, 1000, 10000, 30000], food_setup, food_run),
+    Scenario("flappy.step", "số ống", [10, 100, 1000, 4000], flappy_setup, flappy_run),
+    Scenario("rain.update", "số giọt", [1000, 10000, 100000], rain_setup, rain_update_run),
+    Scenario("rain.draw", "số giọt", [1000, 10000, 100000], rain_draw_setup, rain_draw_run),
+    Scenario("calc.safe_eval", "số hạng", [1, 10, 50, 200], safe_eval_setup, safe_eval_run),
+]}
+
+
+def measure(scenario, size, repeat):
+    """Trả về {"time_ms", "peak_kib"} cho một kích thước, hoặc None nếu kịch bản bị bỏ qua."""
+    best = math.inf
+    total = 0.0
+    runs = 0
+    while runs < repeat or (total < MIN_MEASURE_S and runs < MAX_RUNS):
+        state = scenario.setup(size)
+        if state is None:
+            return None
+        started = time.perf_counter()
+        scenario.run(state)
+        elapsed = time.perf_counter() - started
+        best = min(best, elapsed)
+        total += elapsed
+        runs += 1
+
+    # bộ nhớ: lấy min của hai lần, vì gc vừa dọn free list thì lần chạy sau phải cấp phát thêm
+    peak = math.inf
+    for _ in range(2):
+        state = scenario.setup(size)
+        tracemalloc.start()
+        try:
+            scenario.run(state)
+            peak = min(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    return {"time_ms": round(best * 1000, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def reference_points(results, repeat):
+    """(tên, size, kết quả) ở kích thước lớn nhất của mọi kịch bản; đo thêm các điểm còn thiếu."""
+    reference = results.setdefault("reference", {})
+    points = []
+    for name, scenario in SCENARIOS.items():
+        size = str(scenario.sizes[-1])
+        r = results["scenarios"].get(name, {}).get(size) or reference.get(name)
+        if r is None:
+            r = measure(scenario, int(size), repeat)
+            if r is None:
+                continue
+            reference[name] = r
+        points.append((name, size, r))
+    return points
+
+
+def speed_factor(points, baseline):
+    """Thời gian lần này / lúc ghi baseline, median trên các điểm tham chiếu (1.0 nếu không so được)."""
+    ratios = []
+    for name, size, r in points:
+        base = baseline["scenarios"].get(name, {}).get(size)
+        if base and base["time_ms"] > 0:
+            ratios.append(r["time_ms"] / base["time_ms"])
+    return statistics.median(ratios) if ratios else 1.0
+
+
+def exponent(prev, cur):
+    """k trong time ~ size^k giữa hai điểm liên tiếp của đường cong."""
+    (s0, t0), (s1, t1) = prev, cur
+    if t0 <= 0 or t1 <= 0 or s0 == s1:
+        return None
+    return math.log(t1 / t0) / math.log(s1 / s0)
+
+
+def run_scenario(scenario, repeat):
+    print(f"\n{scenario.name}  ({scenario.unit})")
+    print(f"  {'size':>8} {'time':>11} {'peak':>11} {'k':>6}")
+    results = {}
+    prev = None
+    for size in scenario.sizes:
+        r = measure(scenario, size, repeat)
+        if r is None:
+            print("  bỏ qua (thiếu thư viện)")
+            return {}
+        results[str(size)] = r
+        k = exponent(prev, (size, r["time_ms"])) if prev else None
+        prev = (size, r["time_ms"])
+        print(f"  {size:>8} {r['time_ms']:>8.2f} ms {r['peak_kib']:>7.1f} KiB "
+              f"{'' if k is None else f'{k:>6.2f}'}")
+    return results
+
+
+def compare(results, baseline, scale, time_tolerance, memory_tolerance):
+    """Danh sách (tên, size, mô tả) các hồi quy so với baseline, thời gian baseline nhân theo scale."""
+    failures = []
+    for name, sizes in results["scenarios"].items():
+        for size, r in sizes.items():
+            base = baseline["scenarios"].get(name, {}).get(size)
+            if base is None:
+                continue
+            expected = base["time_ms"] * scale
+            dt = r["time_ms"] - expected
+            if dt > TIME_FLOOR_MS and r["time_ms"] > expected * (1 + time_tolerance):
+                failures.append((name, size, f"time {expected:.2f} -> {r['time_ms']:.2f} ms "
+                                             f"(+{dt / expected * 100:.0f}%)"))
+            dm = r["peak_kib"] - base["peak_kib"]
+            if dm > MEMORY_FLOOR_KIB and r["peak_kib"] > base["peak_kib"] * (1 + memory_tolerance):
+                failures.append((name, size, f"peak {base['peak_kib']:.1f} -> {r['peak_kib']:.1f} KiB"))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo hiệu năng các phần lõi của game và so với baseline")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO", help="mặc định: tất cả (xem --list)")
+    parser.add_argument("--list", action="store_true", help="liệt kê các kịch bản rồi thoát")
+    parser.add_argument("--repeat", type=int, default=5, help="số lần đo tối thiểu mỗi kích thước (lấy min)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="ghi kết quả lần này làm baseline")
+    parser.add_argument("--tolerance", type=float, default=TIME_TOLERANCE,
+                        help=f"ngưỡng chậm hơn cho phép (mặc định {TIME_TOLERANCE})")
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument("--json", metavar="FILE", help="ghi kết quả ra file JSON")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for s in SCENARIOS.values():
+            print(f"{s.name:<26} {s.unit}: {', '.join(map(str, s.sizes))}")
+        return 0
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results = {"scenarios": {}}
+    for name in args.scenarios or SCENARIOS:
+        r = run_scenario(SCENARIOS[name], args.repeat)
+        if r:
+            results["scenarios"][name] = r
+
+    old = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            old = json.load(f)
+    points = reference_points(results, args.repeat) if old else []
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        # chỉ chạy một phần kịch bản thì giữ nguyên các kịch bản khác, quy đổi theo tốc độ lần này
+        baseline = {"scenarios": {}}
+        if old:
+            scale = speed_factor(points, old)
+            for name, sizes in old["scenarios"].items():
+                baseline["scenarios"][name] = {
+                    size: dict(r, time_ms=round(r["time_ms"] * scale, 3)) for size, r in sizes.items()}
+        baseline["scenarios"].update(results["scenarios"])
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"\nđã ghi baseline: {args.baseline}")
+        return 0
+
+    if old is None:
+        print(f"\nchưa có baseline ({args.baseline}); chạy với --update-baseline để tạo")
+        return 0
+    scale = speed_factor(points, old)
+    print(f"\nmáy chạy {1 / scale:.2f}x tốc độ lúc ghi baseline (median {len(points)} kịch bản)")
+    failures = compare(results, old, scale, args.tolerance, args.memory_tolerance)
+    for _ in range(RECHECKS):
+        if not failures:
+            break
+        # máy bận trong chốc lát cũng làm chậm cả một kịch bản: đo lại cả chỗ chậm lẫn các điểm
+        # tham chiếu (để tỉ lệ tốc độ theo kịp máy lúc này), giữ lần nhanh nhất
+        recheck = {(name, size): results["scenarios"][name][size] for name, size, _ in failures}
+        recheck.update(((name, size), r) for name, size, r in points)
+        for (name, size), best in sorted(recheck.items()):
+            r = measure(SCENARIOS[name], int(size), args.repeat)
+            best["time_ms"] = min(best["time_ms"], r["time_ms"])
+        scale = speed_factor(points, old)
+        failures = compare(results, old, scale, args.tolerance, args.memory_tolerance)
+    if failures:
+        print("\nHỒI QUY so với baseline:")
+        for name, size, message in failures:
+            print(f"  {name}[{size}]: {message}")
+        return 1
+    print("\nkhông có hồi quy so với baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
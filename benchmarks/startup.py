@@ -0,0 +1,151 @@
+# benchmarks/startup.py
+# Đo thời gian mở game: từ lúc script bắt đầu import tới khi khung hình đầu tiên được vẽ.
+#
+# Mỗi game được chạy trong một tiến trình riêng với SDL dummy driver và STARTUP_REPORT=exit,
+# nên game tự in "startup: ... ms" sau khung đầu tiên rồi thoát (xem gameloop.report_startup).
+# Ngoài số game tự báo, còn đo tổng thời gian tiến trình (gồm cả khởi động Python).
+#
+#   python benchmarks/startup.py                  # mọi game, 5 lần mỗi game
+#   python benchmarks/startup.py snake --runs 10
+#   python benchmarks/startup.py --cold           # mỗi lần dùng cache font trống (như lần chạy đầu)
+#   python benchmarks/startup.py --json out.json
+#
+# Số đo (median thời gian tới khung đầu tiên) được so với benchmarks/startup_baseline.json,
+# riêng cho chế độ thường và --cold; thoát với mã 1 nếu game nào mở chậm hơn baseline quá
+# ngưỡng (sau khi đã đo lại). Ghi lại baseline bằng --update-baseline.
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import game_scripts  # noqa: E402
+
+# calc_gui dùng tkinter, không qua gameloop
+GAMES = [name for name in game_scripts.SCRIPTS if name != "calc_gui"]
+
+_REPORT = re.compile(r"startup: ([0-9.]+) ms")
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+TOLERANCE = 0.50      # chậm hơn baseline quá 50% -> hồi quy
+FLOOR_MS = 50         # chênh lệch nhỏ hơn mức này coi là nhiễu
+RECHECKS = 2          # đo lại game bị chậm trước khi kết luận
+
+
+def run_once(name, cold=False):
+    """Chạy game một lần; trả về (ms tới khung đầu tiên, ms cả tiến trình)."""
+    env = dict(os.environ,
+               SDL_VIDEODRIVER="dummy",
+               SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1",
+               STARTUP_REPORT="exit")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        if cold:
+            env["XDG_CACHE_HOME"] = cache_dir
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, os.path.join(ROOT, game_scripts.SCRIPTS[name])],
+                              cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+        total = (time.perf_counter() - started) * 1000
+    match = _REPORT.search(proc.stderr)
+    if proc.returncode != 0 or match is None:
+        raise RuntimeError(f"{name}: exit code {proc.returncode}\n{proc.stderr}")
+    return float(match.group(1)), total
+
+
+def measure(names, runs, cold=False):
+    results = {}
+    for name in names:
+        first, total = zip(*(run_once(name, cold) for _ in range(runs)))
+        results[name] = {
+            "first_frame_ms": statistics.median(first),
+            "first_frame_min_ms": min(first),
+            "process_ms": round(statistics.median(total), 1),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Danh sách (game, mô tả) các game mở chậm hơn baseline quá ngưỡng."""
+    failures = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        expected, got = base["first_frame_ms"], r["first_frame_ms"]
+        if got - expected > FLOOR_MS and got > expected * (1 + tolerance):
+            failures.append((name, f"first frame {expected:.1f} -> {got:.1f} ms "
+                                   f"(+{(got - expected) / expected * 100:.0f}%)"))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo thời gian từ import tới khung hình đầu tiên")
+    parser.add_argument("games", nargs="*", metavar="GAME",
+                        help=f"game cần đo (mặc định tất cả: {', '.join(GAMES)})")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--cold", action="store_true", help="không dùng cache font có sẵn")
+    parser.add_argument("--json", metavar="FILE", help="ghi kết quả ra file JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="ghi kết quả lần này làm baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"ngưỡng chậm hơn cho phép (mặc định {TOLERANCE})")
+    args = parser.parse_args(argv)
+    unknown = set(args.games) - set(GAMES)
+    if unknown:
+        parser.error(f"unknown game(s): {', '.join(sorted(unknown))}")
+
+    results = measure(args.games or GAMES, args.runs, args.cold)
+    print(f"{'game':<12} {'first frame':>12} {'(min)':>9} {'process':>9}")
+    for name, r in results.items():
+        print(f"{name:<12} {r['first_frame_ms']:>9.1f} ms {r['first_frame_min_ms']:>6.1f} ms "
+              f"{r['process_ms']:>6.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    mode = "cold" if args.cold else "warm"
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline.setdefault(mode, {}).update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"\nđã ghi baseline ({mode}): {args.baseline}")
+        return 0
+
+    if mode not in baseline:
+        print(f"\nchưa có baseline {mode} ({args.baseline}); chạy với --update-baseline để tạo")
+        return 0
+    failures = compare(results, baseline[mode], args.tolerance)
+    for _ in range(RECHECKS):
+        if not failures:
+            break
+        # máy bận trong chốc lát cũng làm chậm cả loạt: đo lại, giữ median nhanh nhất
+        again = measure([name for name, _ in failures], args.runs, args.cold)
+        for name, r in again.items():
+            if r["first_frame_ms"] < results[name]["first_frame_ms"]:
+                results[name] = r
+        failures = compare(results, baseline[mode], args.tolerance)
+    if failures:
+        print("\nHỒI QUY so với baseline:")
+        for name, message in failures:
+            print(f"  {name}: {message}")
+        return 1
+    print("\nkhông có hồi quy so với baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
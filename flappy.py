@@ -1,26 +1,43 @@
+import time
+_T0 = time.perf_counter()  # mốc đo thời gian từ lúc import tới khung hình đầu tiên
+
 import pygame
 import sys
+import os
+import json
 import random
+import argparse
+
+import fonts
+import gameloop
 
 # Tùy chọn: nếu muốn âm thanh tốt hơn, cài numpy (pip install numpy)
+# (pygame đã tự import numpy khi có, nên import ở đây không tốn thêm thời gian)
 try:
     import numpy as np
     _HAS_NUMPY = True
 except Exception:
     _HAS_NUMPY = False
 
-pygame.init()
+# Mixer chỉ được khởi tạo ở lần nhảy đầu tiên (init_audio), font khi mở game (init_fonts),
+# để cửa sổ hiện ra ngay và import file này (replay, verify, benchmark) không đụng tới
+# thiết bị âm thanh hay font hệ thống
+flap_sound = None
+_audio_ready = False
 
-# Thử khởi tạo âm thanh; nếu lỗi thì tắt âm thanh
-_audio_enabled = True
-try:
-    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-except Exception as e:
-    print("Warning: audio disabled (mixer init failed):", e)
-    _audio_enabled = False
+def init_audio():
+    global flap_sound, _audio_ready
+    _audio_ready = True
+    # Thử khởi tạo âm thanh; nếu lỗi thì tắt âm thanh
+    try:
+        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    except Exception as e:
+        print("Warning: audio disabled (mixer init failed):", e)
+        return
 
-# Tạo âm thanh nhảy nếu có numpy và mixer OK
-if _audio_enabled and _HAS_NUMPY:
+    # Tạo âm thanh nhảy nếu có numpy và mixer OK
+    if not _HAS_NUMPY:
+        return
     freq = 700  # Hz
     duration_ms = 80
     sample_rate = 44100
@@ -35,21 +52,19 @@ if _audio_enabled and _HAS_NUMPY:
         print("Warning: cannot create sound from array:", e)
         flap_sound = None
 
-    def play_flap_sound():
-        try:
-            if flap_sound:
-                flap_sound.play()
-        except Exception:
-            pass
-else:
-    # Nếu không tạo được sound thì hàm rỗng — không gây lỗi
-    def play_flap_sound():
+def play_flap_sound():
+    if not _audio_ready:
+        init_audio()
+    # Nếu không tạo được sound thì bỏ qua — không gây lỗi
+    try:
+        if flap_sound:
+            flap_sound.play()
+    except Exception:
         pass
 
-# Màn hình
+# Màn hình (cửa sổ do gameloop mở khi chạy game, để chế độ replay/verify chạy không cần màn hình)
 WIDTH, HEIGHT = 1920, 1080
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Flappy Bird Python (Simplified)")
+CAPTION = "Flappy Bird Python (Simplified)"
 
 # Màu
 WHITE = (255, 255, 255)
@@ -59,8 +74,8 @@ YELLOW = (255, 255, 0)
 RED = (255, 50, 50)
 GRAY = (130, 130, 130)
 
-clock = pygame.time.Clock()
 FPS = 60
+IDLE_FPS = 15  # game over: giữ chậm lại để giảm CPU
 
 # Thông số game
 gravity = 0.5
@@ -70,31 +85,46 @@ pipe_gap = 150
 pipe_speed = 3
 bird_radius = 15
 
-font = pygame.font.SysFont("arial", 30, bold=True)
-big_font = pygame.font.SysFont("arial", 56, bold=True)
+font = None
+big_font = None
+
+def init_fonts():
+    global font, big_font
+    if font is None:
+        font = fonts.sys_font("arial", 30, bold=True)
+        big_font = fonts.sys_font("arial", 56, bold=True)
+
+REPLAY_VERSION = 1
 
-def reset_game():
+def reset_game(seed=None):
+    # mỗi lượt chơi có seed và luồng random riêng -> có thể chơi lại y hệt
+    if seed is None:
+        seed = random.getrandbits(32)
     return {
         "bird_x": 80,
         "bird_y": HEIGHT // 2,
         "bird_velocity": 0,
         "pipes": [],
-        "score": 0
+        "score": 0,
+        "seed": seed,
+        "rng": random.Random(seed),
+        "tick": 0,
+        "flaps": []  # các tick có nhấn nhảy (input log)
     }
 
-def draw_bird(x, y):
-    pygame.draw.circle(screen, YELLOW, (int(x), int(y)), bird_radius)
-    pygame.draw.circle(screen, RED, (int(x + 5), int(y - 5)), 4)  # mắt
+def draw_bird(surface, x, y):
+    pygame.draw.circle(surface, YELLOW, (int(x), int(y)), bird_radius)
+    pygame.draw.circle(surface, RED, (int(x + 5), int(y - 5)), 4)  # mắt
 
-def create_pipe():
+def create_pipe(rng):
     min_y = 80
     max_y = HEIGHT - pipe_gap - 80
-    y_top = random.randint(min_y, max_y)
+    y_top = rng.randint(min_y, max_y)
     return {"x": WIDTH, "y_top": y_top}
 
-def draw_pipe(pipe):
-    pygame.draw.rect(screen, GREEN, (pipe["x"], 0, pipe_width, pipe["y_top"]))
-    pygame.draw.rect(screen, GREEN, (pipe["x"], pipe["y_top"] + pipe_gap, pipe_width, HEIGHT - (pipe["y_top"] + pipe_gap)))
+def draw_pipe(surface, pipe):
+    pygame.draw.rect(surface, GREEN, (pipe["x"], 0, pipe_width, pipe["y_top"]))
+    pygame.draw.rect(surface, GREEN, (pipe["x"], pipe["y_top"] + pipe_gap, pipe_width, HEIGHT - (pipe["y_top"] + pipe_gap)))
 
 def check_collision(pipe, bird_x, bird_y):
     # chạm trần hoặc sàn
@@ -106,85 +136,198 @@ def check_collision(pipe, bird_x, bird_y):
             return True
     return False
 
-def show_game_over(score):
-    screen.fill(BLUE)
+def flap(state):
+    # ghi lại tick nhấn nhảy; nhiều lần nhấn trong cùng một tick chỉ tính một
+    if not state["flaps"] or state["flaps"][-1] != state["tick"]:
+        state["flaps"].append(state["tick"])
+    state["bird_velocity"] = flap_strength
+
+def step(state):
+    """Chạy một bước mô phỏng cố định (1 tick = 1 khung hình ở FPS). Trả về True nếu thua."""
+    game_over = False
+
+    # cập nhật chim
+    state["bird_velocity"] += gravity
+    state["bird_y"] += state["bird_velocity"]
+
+    # tạo ống mới
+    if len(state["pipes"]) == 0 or state["pipes"][-1]["x"] < WIDTH - 200:
+        state["pipes"].append(create_pipe(state["rng"]))
+
+    # cập nhật ống
+    for pipe in state["pipes"]:
+        pipe["x"] -= pipe_speed
+        if check_collision(pipe, state["bird_x"], state["bird_y"]):
+            game_over = True
+
+    # xóa ống ra khỏi màn hình và tăng điểm
+    if state["pipes"] and state["pipes"][0]["x"] + pipe_width < 0:
+        state["pipes"].pop(0)
+        state["score"] += 1
+
+    state["tick"] += 1
+    return game_over
+
+def simulate(seed, flaps, max_ticks):
+    """Chơi lại một lượt không cần màn hình: áp dụng các tick nhảy đã ghi, dừng khi thua."""
+    state = reset_game(seed)
+    pending = iter(flaps)
+    next_flap = next(pending, None)
+    while state["tick"] < max_ticks:
+        if next_flap == state["tick"]:
+            flap(state)
+            next_flap = next(pending, None)
+        if step(state):
+            return state, True
+    return state, False
+
+def save_replay(path, state):
+    # lưu tick nhảy dạng hiệu số (delta) để file gọn
+    deltas = []
+    prev = 0
+    for t in state["flaps"]:
+        deltas.append(t - prev)
+        prev = t
+    data = {
+        "v": REPLAY_VERSION,
+        "seed": state["seed"],
+        "ticks": state["tick"],
+        "score": state["score"],
+        "flaps": deltas
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+def load_replay(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("v") != REPLAY_VERSION:
+        raise ValueError(f"{path}: phiên bản replay không hỗ trợ: {data.get('v')}")
+    flaps = []
+    t = 0
+    for d in data["flaps"]:
+        t += d
+        flaps.append(t)
+    data["flaps"] = flaps
+    return data
+
+def verify_replay(path):
+    """Trả về (ok, replay, state): ok khi mô phỏng lại cho đúng số tick và điểm đã ghi."""
+    replay = load_replay(path)
+    state, ended = simulate(replay["seed"], replay["flaps"], replay["ticks"])
+    ok = ended and state["tick"] == replay["ticks"] and state["score"] == replay["score"]
+    return ok, replay, state
+
+def verify_corpus(paths):
+    failed = 0
+    for path in paths:
+        ok, replay, state = verify_replay(path)
+        if not ok:
+            failed += 1
+            print(f"FAIL {path}: ghi {replay['score']} điểm/{replay['ticks']} tick, "
+                  f"mô phỏng {state['score']} điểm/{state['tick']} tick")
+    print(f"{len(paths) - failed}/{len(paths)} replay khớp")
+    return failed == 0
+
+def show_game_over(surface, score):
+    surface.fill(BLUE)
     over_text = big_font.render("GAME OVER", True, RED)
-    screen.blit(over_text, (WIDTH // 2 - over_text.get_width() // 2, HEIGHT // 2 - 110))
+    surface.blit(over_text, (WIDTH // 2 - over_text.get_width() // 2, HEIGHT // 2 - 110))
 
     score_text = font.render(f"Điểm: {score}", True, WHITE)
-    screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, HEIGHT // 2 - 40))
+    surface.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, HEIGHT // 2 - 40))
 
     restart_rect = pygame.Rect(WIDTH // 2 - 100, HEIGHT // 2 + 10, 200, 60)
-    pygame.draw.rect(screen, GRAY, restart_rect, border_radius=10)
+    pygame.draw.rect(surface, GRAY, restart_rect, border_radius=10)
     restart_text = font.render("RESTART", True, WHITE)
-    screen.blit(restart_text, (restart_rect.centerx - restart_text.get_width() // 2, restart_rect.centery - restart_text.get_height() // 2))
-
-    pygame.display.flip()
+    surface.blit(restart_text, (restart_rect.centerx - restart_text.get_width() // 2, restart_rect.centery - restart_text.get_height() // 2))
     return restart_rect
 
-def main():
-    state = reset_game()
-    running = True
-    game_over = False
-    restart_button = None
-
-    while running:
-        # Nếu đang trong trạng thái game over, vẽ màn hình Game Over trước khi xử lý sự kiện
-        if game_over:
-            restart_button = show_game_over(state["score"])
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-
-            if not game_over:
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                    state["bird_velocity"] = flap_strength
-                    play_flap_sound()
-            else:
-                # khi game over: space hoặc click vào nút restart -> reset
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                    state = reset_game()
-                    game_over = False
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if restart_button and restart_button.collidepoint(event.pos):
-                        state = reset_game()
-                        game_over = False
-
-        if not game_over:
-            screen.fill(BLUE)
-
-            # cập nhật chim
-            state["bird_velocity"] += gravity
-            state["bird_y"] += state["bird_velocity"]
-
-            # tạo ống mới
-            if len(state["pipes"]) == 0 or state["pipes"][-1]["x"] < WIDTH - 200:
-                state["pipes"].append(create_pipe())
-
-            # cập nhật và vẽ ống
-            for pipe in state["pipes"]:
-                pipe["x"] -= pipe_speed
-                draw_pipe(pipe)
-                if check_collision(pipe, state["bird_x"], state["bird_y"]):
-                    game_over = True
-
-            # xóa ống ra khỏi màn hình và tăng điểm
-            if state["pipes"] and state["pipes"][0]["x"] + pipe_width < 0:
-                state["pipes"].pop(0)
-                state["score"] += 1
-
-            # vẽ chim và điểm
-            draw_bird(state["bird_x"], state["bird_y"])
-            score_text = font.render(f"Score: {state['score']}", True, WHITE)
-            screen.blit(score_text, (10, 10))
-
-            pygame.display.flip()
-            clock.tick(FPS)
+def draw_frame(surface, state):
+    surface.fill(BLUE)
+    for pipe in state["pipes"]:
+        draw_pipe(surface, pipe)
+    draw_bird(surface, state["bird_x"], state["bird_y"])
+    score_text = font.render(f"Score: {state['score']}", True, WHITE)
+    surface.blit(score_text, (10, 10))
+
+class FlappyScene:
+    """Scene cho gameloop: mỗi update là một tick mô phỏng (step)."""
+
+    step = 1 / FPS
+
+    def __init__(self, replay=None, record_dir=None):
+        init_fonts()
+        self.record_dir = record_dir
+        self.running = True
+        self.restart_button = None
+        self.start(replay)
+
+    def start(self, replay=None):
+        # replay: phát lại các tick nhảy đã ghi thay vì đọc phím
+        if replay:
+            self.state = reset_game(replay["seed"])
+            self.replay_flaps = set(replay["flaps"])
         else:
-            # game over: giữ chậm lại để giảm CPU
-            clock.tick(15)
+            self.state = reset_game()
+            self.replay_flaps = None
+        self.game_over = False
+        self.dirty = True
+
+    @property
+    def active(self):
+        return not self.game_over
+
+    def handle_event(self, event):
+        if not self.game_over:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE and self.replay_flaps is None:
+                flap(self.state)
+                play_flap_sound()
+        else:
+            # khi game over: space hoặc click vào nút restart -> reset
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                self.start()
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if self.restart_button and self.restart_button.collidepoint(event.pos):
+                    self.start()
+
+    def update(self, dt):
+        state = self.state
+        if self.replay_flaps is not None and state["tick"] in self.replay_flaps:
+            flap(state)
+            play_flap_sound()
+
+        self.game_over = step(state)
+        if self.game_over and self.record_dir and self.replay_flaps is None:
+            os.makedirs(self.record_dir, exist_ok=True)
+            save_replay(os.path.join(self.record_dir, f"run_{state['seed']}.json"), state)
+        self.dirty = True
+
+    def render(self, surface, alpha):
+        if self.game_over:
+            self.restart_button = show_game_over(surface, self.state["score"])
+        else:
+            # vẽ ống, chim và điểm
+            draw_frame(surface, self.state)
+        self.dirty = False
+
+def main(replay=None, record_dir=None):
+    # mở cửa sổ trước, rồi mới nạp font / dựng scene
+    gameloop.open_display((WIDTH, HEIGHT), CAPTION)
+    scene = FlappyScene(replay, record_dir)
+    gameloop.run(scene, (WIDTH, HEIGHT), CAPTION, fps=FPS, idle_fps=IDLE_FPS, started=_T0)
+    pygame.quit()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=CAPTION)
+    parser.add_argument("--record", metavar="DIR", help="lưu replay của mỗi lượt chơi vào thư mục DIR")
+    parser.add_argument("--replay", metavar="FILE", help="xem lại một replay đã ghi")
+    parser.add_argument("--verify", metavar="FILE", nargs="+",
+                        help="mô phỏng lại các replay không cần màn hình và kiểm tra điểm")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.verify:
+        sys.exit(0 if verify_corpus(args.verify) else 1)
+    main(replay=load_replay(args.replay) if args.replay else None, record_dir=args.record)
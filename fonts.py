@@ -0,0 +1,85 @@
+# fonts.py
+# Tạo font hệ thống nhanh hơn pygame.font.SysFont.
+#
+# SysFont quét toàn bộ font của máy (fc-list / registry) ở lần gọi đầu tiên trong mỗi
+# tiến trình, chiếm phần lớn thời gian mở game. Ở đây kết quả tra cứu (tên, đậm,
+# nghiêng) -> đường dẫn file font được lưu:
+#   - trong bộ nhớ, cho các lần gọi sau trong cùng tiến trình
+#   - trong file JSON (CACHE_PATH), cho các lần chạy sau; chỉ quét lại khi chưa có
+#     trong cache, file font đã bị xóa, hoặc lần trước không tìm thấy font và đã quá
+#     MISS_TTL giây (để font cài thêm sau vẫn được nhận). Xóa file cache để buộc quét lại.
+# name=None (font mặc định của pygame) không cần quét gì cả.
+
+import json
+import os
+import time
+
+import pygame
+
+CACHE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                          "free-game", "fonts.json")
+
+MISS_TTL = 24 * 3600  # giây giữ kết quả "không tìm thấy font" trước khi quét lại
+
+# khóa "tên|đậm|nghiêng" -> [đường dẫn hoặc None, tự làm đậm, tự làm nghiêng, thời điểm tra]
+_paths = None
+
+
+def _load():
+    global _paths
+    if _paths is None:
+        try:
+            with open(CACHE_PATH, encoding="utf-8") as f:
+                _paths = json.load(f)
+        except (OSError, ValueError):
+            _paths = {}
+    return _paths
+
+
+def _save():
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        tmp = CACHE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_paths, f, indent=1, sort_keys=True)
+        os.replace(tmp, CACHE_PATH)
+    except OSError:
+        pass  # không ghi được cache thì lần sau quét lại, không sao
+
+
+def _stale(entry):
+    if entry is None or len(entry) != 4:
+        return True
+    path, _, _, checked = entry
+    if path is None:
+        return time.time() - checked > MISS_TTL
+    return not os.path.exists(path)
+
+
+def lookup(name, bold=False, italic=False):
+    """Đường dẫn font và cờ tự làm đậm / nghiêng, giống hệt cách SysFont chọn font."""
+    paths = _load()
+    key = f"{name}|{int(bold)}|{int(italic)}"
+    entry = paths.get(key)
+    if _stale(entry):
+        # để SysFont tự tra cứu nhưng lấy kết quả thay vì tạo Font
+        path, set_bold, set_italic = pygame.font.SysFont(
+            name, 0, bold, italic, constructor=lambda path, size, b, i: (path, b, i))
+        entry = paths[key] = [path, set_bold, set_italic, round(time.time())]
+        _save()
+    return entry[:3]
+
+
+def sys_font(name, size, bold=False, italic=False):
+    """Thay cho pygame.font.SysFont(name, size, bold, italic)."""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    if not name:
+        font = pygame.font.Font(None, size)
+        set_bold, set_italic = bold, italic
+    else:
+        path, set_bold, set_italic = lookup(name, bold, italic)
+        font = pygame.font.Font(path, size)
+    font.set_bold(set_bold)
+    font.set_italic(set_italic)
+    return font
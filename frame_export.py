@@ -0,0 +1,108 @@
+# frame_export.py
+# Ghi khung hình ra file / pipe để dựng video offline (không cần cửa sổ).
+#
+# Đích ghi:
+#   "-"          -> luồng raw ra stdout, ví dụ:
+#                   python "print('hello wolrd').py" --export - | \
+#                       ffmpeg -f rawvideo -pix_fmt rgb0 -s 1920x1080 -r 60 -i - out.mp4
+#   thư mục      -> mỗi khung một file frame_000000.raw, ...
+#   đường dẫn    -> mọi khung nối tiếp vào một file raw
+#
+# Định dạng:
+#   "rgb0"  (mặc định) 4 byte/pixel R, G, B, 0. Surface được tạo đúng thứ tự byte này nên
+#           ghi thẳng bộ nhớ pixel qua Surface.get_view("1"), không copy.
+#   "rgb24" 3 byte/pixel, chuyển bằng pygame.image.tobytes (một lần copy, ở luồng ghi).
+#
+# Double-buffering: có `buffers` surface dùng xoay vòng; trong lúc luồng ghi đang đẩy
+# khung trước ra đĩa / pipe thì luồng chính đã vẽ khung sau vào surface còn lại.
+
+import os
+import queue
+import sys
+import threading
+
+import pygame
+
+PIXEL_FORMATS = ("rgb0", "rgb24")
+
+if sys.byteorder == "little":
+    RGB0_MASKS = (0x000000FF, 0x0000FF00, 0x00FF0000, 0)
+else:
+    RGB0_MASKS = (0xFF000000, 0x00FF0000, 0x0000FF00, 0)
+
+
+class FrameExporter:
+    def __init__(self, size, target, pixel_format="rgb0", buffers=2):
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"unknown pixel format {pixel_format!r}, expected one of {PIXEL_FORMATS}")
+        self.size = size
+        self.pixel_format = pixel_format
+        self.frames = 0
+        self._directory = None
+        if target == "-":
+            self._stream = sys.stdout.buffer
+            self._owns_stream = False
+        elif os.path.isdir(target):
+            self._directory = target
+            self._stream = None
+            self._owns_stream = False
+        else:
+            self._stream = open(target, "wb")
+            self._owns_stream = True
+        self._free = queue.Queue()
+        for _ in range(buffers):
+            self._free.put(pygame.Surface(size, 0, 32, RGB0_MASKS))
+        self._filled = queue.Queue()
+        self._error = None
+        self._thread = threading.Thread(target=self._write_loop, name="frame-export", daemon=True)
+        self._thread.start()
+
+    def acquire(self):
+        """Lấy một surface trống để vẽ khung tiếp theo (chờ nếu luồng ghi chưa trả)."""
+        surface = self._free.get()
+        if self._error is not None:
+            raise self._error
+        return surface
+
+    def submit(self, surface):
+        self._filled.put((self.frames, surface))
+        self.frames += 1
+
+    def close(self):
+        self._filled.put(None)
+        self._thread.join()
+        if self._stream is not None:
+            self._stream.flush()
+            if self._owns_stream:
+                self._stream.close()
+        if self._error is not None:
+            raise self._error
+
+    def _write(self, stream, surface):
+        if self.pixel_format == "rgb0":
+            view = surface.get_view("1")
+            try:
+                stream.write(view)
+            finally:
+                del view
+        else:
+            stream.write(pygame.image.tobytes(surface, "RGB"))
+
+    def _write_loop(self):
+        while True:
+            item = self._filled.get()
+            if item is None:
+                return
+            index, surface = item
+            try:
+                if self._error is None:
+                    if self._directory is not None:
+                        path = os.path.join(self._directory, f"frame_{index:06d}.raw")
+                        with open(path, "wb") as f:
+                            self._write(f, surface)
+                    else:
+                        self._write(self._stream, surface)
+            except Exception as e:  # báo lỗi cho luồng chính ở lần acquire() tiếp theo
+                self._error = e
+            finally:
+                self._free.put(surface)
@@ -0,0 +1,206 @@
+# frame_stats.py
+# Đo thời gian từng khung hình, dùng chung cho các game pygame.
+#
+# Bật bằng biến môi trường:
+#   FRAME_STATS=1                   -> đo thời gian từng pha (events, update, draw, flip)
+#   FRAME_STATS_OUT=stats.csv|.json -> ghi số liệu ra file khi thoát
+# Trong game nhấn F3 để bật/tắt bảng overlay (p50/p95/p99).
+#
+# Khi tắt, from_env() trả về NULL_STATS: mọi hàm đều rỗng nên vòng lặp game không tốn gì thêm.
+
+import atexit
+import json
+import os
+import time
+from array import array
+
+import pygame
+
+PHASES = ("events", "update", "draw", "flip")
+WINDOW = 600            # số khung hình gần nhất giữ lại (10 giây ở 60 FPS)
+HIST_BIN_MS = 1.0       # độ rộng mỗi cột histogram
+HIST_BINS = 100         # cột cuối gom mọi khung hình >= 99 ms
+OVERLAY_KEY = pygame.K_F3
+OVERLAY_REFRESH = 0.25  # giây giữa hai lần tính lại số liệu trên overlay
+
+_perf = time.perf_counter
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+class FrameStats:
+    def __init__(self, window=WINDOW, out_path=None):
+        self.window = window
+        self.out_path = out_path
+        self.count = 0
+        # ring buffer (ms): thời gian xử lý khung hình và khoảng cách giữa hai khung hình
+        self.busy = array('d', bytes(8 * window))
+        self.interval = array('d', bytes(8 * window))
+        self.phases = {name: array('d', bytes(8 * window)) for name in PHASES}
+        self.histogram = [0] * HIST_BINS  # chỉ đếm các khung hình đang nằm trong ring buffer
+        self.show_overlay = False
+        self._slot = 0
+        self._t_begin = None
+        self._t_last = 0.0
+        self._font = None
+        self._overlay_lines = []
+        self._overlay_panel = None
+        self._overlay_time = 0.0
+
+    # ---------- đo ----------
+    def begin_frame(self):
+        now = _perf()
+        slot = self.count % self.window
+        if self._t_begin is not None:
+            self.interval[slot] = (now - self._t_begin) * 1000
+        for buf in self.phases.values():
+            buf[slot] = 0.0
+        self._slot = slot
+        self._t_begin = self._t_last = now
+
+    def mark(self, phase):
+        """Cộng thời gian từ lần mark trước (hoặc begin_frame) vào pha `phase`."""
+        now = _perf()
+        buf = self.phases.get(phase)
+        if buf is None:
+            buf = self.phases[phase] = array('d', bytes(8 * self.window))
+        buf[self._slot] += (now - self._t_last) * 1000
+        self._t_last = now
+
+    @staticmethod
+    def _bin(ms):
+        return min(HIST_BINS - 1, int(ms / HIST_BIN_MS))
+
+    def end_frame(self):
+        busy_ms = (_perf() - self._t_begin) * 1000
+        if self.count >= self.window:
+            # khung hình cũ nhất rời cửa sổ -> bỏ khỏi histogram
+            self.histogram[self._bin(self.busy[self._slot])] -= 1
+        self.busy[self._slot] = busy_ms
+        self.histogram[self._bin(busy_ms)] += 1
+        self.count += 1
+
+    # ---------- số liệu ----------
+    def _recent(self, buf):
+        n = min(self.count, self.window)
+        if self.count <= self.window:
+            return list(buf[:n])
+        start = self.count % self.window
+        return list(buf[start:]) + list(buf[:start])
+
+    def summary(self):
+        busy = sorted(self._recent(self.busy))
+        interval = [v for v in self._recent(self.interval) if v > 0]
+        n = len(busy)
+        mean_interval = sum(interval) / len(interval) if interval else 0.0
+        return {
+            "frames": self.count,
+            "fps": 1000 / mean_interval if mean_interval else 0.0,
+            "busy_ms": {
+                "p50": percentile(busy, 50),
+                "p95": percentile(busy, 95),
+                "p99": percentile(busy, 99),
+                "max": busy[-1] if busy else 0.0,
+            },
+            "phase_mean_ms": {name: (sum(self._recent(buf)) / n if n else 0.0)
+                              for name, buf in self.phases.items()},
+            "histogram_ms": {"bin_width": HIST_BIN_MS, "counts": list(self.histogram)},
+        }
+
+    # ---------- overlay ----------
+    def handle_event(self, event):
+        """Trả về True nếu sự kiện là phím bật/tắt overlay."""
+        if event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+            self.show_overlay = not self.show_overlay
+            return True
+        return False
+
+    def draw_overlay(self, surface):
+        if not self.show_overlay:
+            return
+        now = _perf()
+        if now - self._overlay_time > OVERLAY_REFRESH:
+            self._overlay_time = now
+            if self._font is None:
+                self._font = pygame.font.Font(None, 20)
+            s = self.summary()
+            b = s["busy_ms"]
+            text = [f"{s['fps']:.1f} fps  ({s['frames']} frames)",
+                    f"p50 {b['p50']:.2f}  p95 {b['p95']:.2f}  p99 {b['p99']:.2f} ms"]
+            text += [f"{name:<7}{ms:6.2f} ms" for name, ms in s["phase_mean_ms"].items()]
+            self._overlay_lines = [self._font.render(line, True, (255, 255, 255)) for line in text]
+            w = max(img.get_width() for img in self._overlay_lines) + 12
+            h = sum(img.get_height() for img in self._overlay_lines) + 12
+            if self._overlay_panel is None or self._overlay_panel.get_size() != (w, h):
+                self._overlay_panel = pygame.Surface((w, h))
+                self._overlay_panel.set_alpha(170)
+        if not self._overlay_lines:
+            return
+        panel = self._overlay_panel
+        x = surface.get_width() - panel.get_width() - 8
+        surface.blit(panel, (x, 8))
+        y = 14
+        for img in self._overlay_lines:
+            surface.blit(img, (x + 6, y))
+            y += img.get_height()
+
+    # ---------- ghi file ----------
+    def dump(self, path=None):
+        path = path or self.out_path
+        if not path or not self.count:
+            return
+        if path.endswith(".json"):
+            data = self.summary()
+            data["busy_ms"]["recent"] = self._recent(self.busy)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            return
+        names = list(self.phases)
+        columns = [self._recent(self.busy), self._recent(self.interval)] + \
+                  [self._recent(self.phases[name]) for name in names]
+        first = self.count - len(columns[0])
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(",".join(["frame", "busy_ms", "interval_ms"] + [name + "_ms" for name in names]) + "\n")
+            for i, row in enumerate(zip(*columns)):
+                f.write(",".join([str(first + i)] + [f"{v:.4f}" for v in row]) + "\n")
+
+
+class _NullStats:
+    """Phiên bản tắt: mọi hàm đều rỗng."""
+    show_overlay = False
+
+    def begin_frame(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def handle_event(self, event):
+        return False
+
+    def draw_overlay(self, surface):
+        pass
+
+    def dump(self, path=None):
+        pass
+
+
+NULL_STATS = _NullStats()
+
+
+def from_env(environ=os.environ):
+    """Tạo FrameStats nếu FRAME_STATS được bật, ngược lại trả về NULL_STATS."""
+    if environ.get("FRAME_STATS", "") in ("", "0"):
+        return NULL_STATS
+    stats = FrameStats(out_path=environ.get("FRAME_STATS_OUT") or None)
+    if stats.out_path:
+        atexit.register(stats.dump)
+    return stats
@@ -0,0 +1,36 @@
+# game_scripts.py
+# Nạp các file game như module Python. Tên file có dấu cách, dấu nháy, ngoặc
+# nên không dùng `import` trực tiếp được.
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# tên module -> tên file
+SCRIPTS = {
+    "flappy": "flappy.py",
+    "minesweeper": "# minesweeper.py",
+    "snake": "print('lest play game').py",
+    "rain": "print('hello wolrd').py",
+    "calc_gui": "# calc_gui.py",
+}
+
+
+def load(name):
+    """Nạp (một lần cho mỗi tiến trình) file game ứng với `name` trong SCRIPTS."""
+    module_name = "game_" + name
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    path = os.path.join(ROOT, SCRIPTS[name])
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
@@ -0,0 +1,184 @@
+# gameloop.py
+# Khung vòng lặp dùng chung cho các game pygame.
+#
+# Mỗi game viết một Scene (xem class Scene bên dưới) rồi gọi:
+#   gameloop.run(scene, (WIDTH, HEIGHT), "Tên cửa sổ")
+# Runner lo: mở cửa sổ khi cần (không mở lúc import), đọc sự kiện, cập nhật logic theo
+# bước cố định scene.step bằng accumulator, vẽ lại chỉ khi scene.dirty, giảm tốc độ vòng
+# lặp xuống IDLE_FPS khi scene không tự thay đổi (hoặc chỉ cần bước thưa hơn IDLE_FPS, như
+# đồng hồ của minesweeper), và đo thời gian bằng frame_stats.
+#
+# Khởi động nhanh: chỉ bật display (không pygame.init(), vốn mở cả mixer / joystick),
+# cửa sổ hiện ra (một khung đen) ngay khi open_display() được gọi, trước khi game nạp font
+# và dựng scene. Truyền started=time.perf_counter() lấy ở đầu script thì runner đo thời gian
+# từ lúc import tới khung hình đầu tiên; đặt biến môi trường STARTUP_REPORT=1 để in ra
+# stderr, STARTUP_REPORT=exit để in rồi thoát luôn (dùng cho benchmarks/startup.py).
+#
+# Không cửa sổ (xuất video, kiểm thử): gameloop.run_headless(scene, frames, fps, surface, on_frame)
+# chạy cùng các bước cố định đó theo thời gian mô phỏng, nhanh nhất có thể, và lấy mẫu khung
+# hình ở `fps` vào Surface ẩn.
+
+import os
+import sys
+import time
+from typing import Protocol
+
+import pygame
+
+import frame_stats
+
+FPS = 60
+IDLE_FPS = 15
+STARTUP_ENV = "STARTUP_REPORT"
+MAX_STEPS_PER_FRAME = 5  # tránh dồn bước khi máy bị khựng
+
+_display = None
+
+
+class Scene(Protocol):
+    """Giao diện một màn chơi.
+
+    step     - số giây mỗi bước logic (đọc lại mỗi bước, nên có thể đổi trong lúc chơi)
+    running  - False thì runner dừng
+    dirty    - True khi cần vẽ lại; render() tự đặt lại False nếu không còn gì thay đổi
+    active   - True khi scene tự thay đổi theo thời gian (cần gọi update); False thì runner
+               chỉ chờ sự kiện ở IDLE_FPS. Scene active có step >= 1 / idle_fps cũng chỉ
+               chạy ở idle_fps, update được gọi theo nhịp đó
+    """
+
+    step: float
+    running: bool
+    dirty: bool
+    active: bool
+
+    def handle_event(self, event) -> None: ...
+
+    def update(self, dt: float) -> None: ...
+
+    def render(self, surface, alpha: float):
+        """Vẽ lên surface; alpha (0..1) là phần đã trôi qua của bước tiếp theo.
+
+        Trả về None nếu đã vẽ lại toàn màn hình, hoặc danh sách Rect đã thay đổi.
+        """
+
+
+def open_display(size, caption=None):
+    """Mở (một lần) cửa sổ kích thước `size`; trả về surface màn hình."""
+    global _display
+    if _display is None or _display.get_size() != tuple(size):
+        pygame.display.init()
+        if caption is not None:
+            pygame.display.set_caption(caption)
+        _display = pygame.display.set_mode(size)
+        # cho cửa sổ hiện ra ngay, trong lúc game còn đang nạp
+        _display.fill((0, 0, 0))
+        pygame.display.flip()
+    elif caption is not None:
+        pygame.display.set_caption(caption)
+    return _display
+
+
+def report_startup(started):
+    """In thời gian từ `started` (perf_counter) tới bây giờ nếu STARTUP_REPORT được đặt.
+
+    Trả về True nếu STARTUP_REPORT=exit (chương trình nên dừng sau khung đầu tiên).
+    """
+    mode = os.environ.get(STARTUP_ENV)
+    if not mode:
+        return False
+    print(f"startup: {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr, flush=True)
+    return mode == "exit"
+
+
+def run(scene, size, caption=None, fps=FPS, idle_fps=IDLE_FPS, started=None):
+    """Chạy scene trong cửa sổ tới khi scene.running = False hoặc đóng cửa sổ.
+
+    started: mốc perf_counter lúc script bắt đầu, để đo thời gian tới khung hình đầu tiên.
+    """
+    surface = open_display(size, caption)
+    clock = pygame.time.Clock()
+    stats = frame_stats.from_env()
+    accumulator = 0.0
+    full_flip = False
+    clock.tick()
+    while scene.running:
+        busy = scene.dirty or stats.show_overlay or (scene.active and scene.step < 1 / idle_fps)
+        elapsed = clock.tick(fps if busy else idle_fps) / 1000
+        stats.begin_frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                scene.running = False
+                break
+            if stats.handle_event(event):
+                # bật hay tắt overlay đều phải vẽ lại toàn màn hình: lúc tắt, vùng overlay cũ
+                # không nằm trong các ô mà scene vẽ lại từng phần
+                if hasattr(scene, "invalidate"):
+                    scene.invalidate()
+                scene.dirty = True
+                full_flip = True
+                continue
+            scene.handle_event(event)
+        if not scene.running:
+            break
+        stats.mark("events")
+
+        if scene.active:
+            accumulator += elapsed
+            steps = 0
+            while accumulator >= scene.step:
+                accumulator -= scene.step
+                scene.update(scene.step)
+                steps += 1
+                if steps == MAX_STEPS_PER_FRAME or not scene.active:
+                    accumulator = 0.0
+                    break
+        else:
+            accumulator = 0.0
+        stats.mark("update")
+
+        if scene.dirty or stats.show_overlay:
+            if stats.show_overlay and hasattr(scene, "invalidate"):
+                # overlay vẽ đè lên màn hình nên scene phải vẽ lại toàn bộ
+                scene.invalidate()
+            rects = scene.render(surface, accumulator / scene.step)
+            stats.mark("draw")
+            stats.draw_overlay(surface)
+            if rects is None or stats.show_overlay or full_flip:
+                pygame.display.flip()
+                full_flip = False
+            elif rects:
+                pygame.display.update(rects)
+            stats.mark("flip")
+            if started is not None:
+                if report_startup(started):
+                    scene.running = False
+                started = None
+        stats.end_frame()
+    return scene
+
+
+def run_headless(scene, frames, fps=FPS, surface=None, on_frame=None):
+    """Chạy scene không cần cửa sổ, theo thời gian mô phỏng thay vì đồng hồ thật.
+
+    Logic vẫn đi theo bước cố định scene.step (dừng khi scene hết running / active); khung thứ i
+    lấy ở thời điểm i / fps, nên fps chỉ đổi số khung chứ không đổi tốc độ của scene.
+    surface: Surface ẩn để vẽ mỗi khung, hoặc hàm trả về Surface cho từng khung (vd. bộ đệm của
+    frame_export.FrameExporter); None thì chỉ chạy logic. on_frame(surface) được gọi sau mỗi
+    khung đã vẽ. Trả về scene.
+    """
+    now = 0.0
+    for frame in range(frames):
+        due = frame / fps
+        # sai số cộng dồn float: coi bước kết thúc đúng lúc lấy khung là đã tới
+        while scene.running and scene.active and now + scene.step <= due + scene.step * 1e-3:
+            scene.update(scene.step)
+            now += scene.step
+        if not scene.running:
+            break
+        if surface is None:
+            continue
+        target = surface() if callable(surface) else surface
+        scene.render(target, min(max((due - now) / scene.step, 0.0), 1.0))
+        if on_frame is not None:
+            on_frame(target)
+    return scene
@@ -0,0 +1,126 @@
+# particles.py
+# Hệ hạt cho hiệu ứng mưa / sao: dữ liệu lưu theo từng mảng NumPy (x, y, tốc độ, ...)
+# thay vì mỗi hạt một object, cập nhật cả mảng trong một bước và vẽ theo lô.
+#
+# Vẽ mưa có hai cách:
+#   - ít hạt: blit các vệt mưa vẽ sẵn (một sprite cho mỗi độ dài) bằng Surface.blits
+#   - nhiều hạt: đánh dấu điểm đầu vệt vào một mảng bool, "kéo dài" các dấu theo trục y
+#     bằng vài phép OR dịch bit, rồi tô thẳng vào pygame.surfarray.pixels2d
+# Cả hai cho ra đúng các pixel như pygame.draw.line(..., width=2) của bản cũ.
+
+import numpy as np
+import pygame
+
+SPRITE_LIMIT = 5000  # trên ngưỡng này vẽ mưa bằng surfarray
+
+
+class RainField:
+    def __init__(self, count, width, height, color, rng=None,
+                 length_range=(15, 30), speed_range=(4, 10)):
+        self.width = width
+        self.height = height
+        self.color = color
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.x = self.rng.integers(0, width + 1, count, dtype=np.int32)
+        self.y = self.rng.integers(-height, 1, count, dtype=np.int32)
+        self.length = self.rng.integers(length_range[0], length_range[1] + 1, count, dtype=np.int32)
+        self.speed = self.rng.integers(speed_range[0], speed_range[1] + 1, count, dtype=np.int32)
+        # vệt dài length + 1 pixel = hợp của hai đoạn dài `segment`, một đoạn bắt đầu ở đầu vệt,
+        # một đoạn kết thúc ở cuối vệt (cần min + 1 >= segment để hai đoạn chạm nhau)
+        self.segment = (length_range[1] + 2) // 2
+        if length_range[0] + 1 < self.segment:
+            raise ValueError(f"length_range {length_range} too wide for two-segment drawing")
+        self._cover = None
+        # vệt mưa rộng 2 pixel, dài length + 1 pixel (giống draw.line width=2)
+        self._sprites = {}
+        for length in range(length_range[0], length_range[1] + 1):
+            sprite = pygame.Surface((2, length + 1))
+            sprite.fill(color)
+            self._sprites[length] = sprite
+
+    def __len__(self):
+        return len(self.x)
+
+    def update(self):
+        self.y += self.speed
+        out = self.y > self.height
+        n = int(np.count_nonzero(out))
+        if n:
+            self.y[out] = self.rng.integers(-20, -4, n, dtype=np.int32)
+            self.x[out] = self.rng.integers(0, self.width + 1, n, dtype=np.int32)
+
+    def draw(self, surface):
+        if len(self.x) <= SPRITE_LIMIT:
+            sprites = self._sprites
+            surface.blits(zip([sprites[n] for n in self.length.tolist()],
+                              zip(self.x.tolist(), self.y.tolist())), doreturn=False)
+        else:
+            self.draw_surfarray(surface)
+
+    def draw_surfarray(self, surface):
+        w, h = surface.get_size()
+        seg = self.segment
+        pad = 2 * seg  # vệt nhô ra ngoài màn hình tối đa 2 * seg - 1 pixel
+        if self._cover is None or self._cover.shape != (w + 1, h + 2 * pad):
+            self._cover = np.zeros((w + 1, h + 2 * pad), dtype=np.bool_)
+        cover = self._cover
+        cover.fill(False)
+
+        top = self.y
+        bottom = self.y + self.length + 1
+        keep = (bottom > 0) & (top < h) & (self.x < w)
+        x, top, bottom = self.x[keep], top[keep], bottom[keep]
+        stride = cover.shape[1]
+        flat = cover.reshape(-1)
+        base = x * stride + pad
+        for col in (base, base + stride):  # rộng 2 pixel: cột x và x + 1
+            flat[col + top] = True
+            flat[col + bottom - seg] = True
+        k = 1
+        while k < seg:
+            cover[:, k:] |= cover[:, :-k]
+            k *= 2
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        np.copyto(pixels, surface.map_rgb(self.color), where=cover[:w, pad:pad + h])
+        del pixels
+
+
+class StarField:
+    def __init__(self, count, width, height, rng=None, radius_range=(1, 3), brightness_range=(100, 255)):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.lo, self.hi = brightness_range
+        self.x = self.rng.integers(0, width + 1, count, dtype=np.int32)
+        self.y = self.rng.integers(0, height // 2 + 1, count, dtype=np.int32)
+        self.radius = self.rng.integers(radius_range[0], radius_range[1] + 1, count, dtype=np.int32)
+        self.brightness = self.rng.integers(self.lo, self.hi + 1, count, dtype=np.int32)
+        self.change = self.rng.choice(np.array([-1, 1], dtype=np.int32), count)
+        # bảng sprite vẽ sẵn theo (bán kính, độ sáng); sao đứng yên nên vị trí blit cố định
+        levels = self.hi - self.lo + 1
+        self._levels = levels
+        self._r0 = radius_range[0]
+        self._table = []
+        for r in range(radius_range[0], radius_range[1] + 1):
+            for b in range(self.lo, self.hi + 1):
+                sprite = pygame.Surface((2 * r + 2, 2 * r + 2))
+                sprite.set_colorkey((0, 0, 0))
+                pygame.draw.circle(sprite, (b, b, b), (r + 1, r + 1), r)
+                self._table.append(sprite)
+        self._pos = list(zip((self.x - self.radius - 1).tolist(), (self.y - self.radius - 1).tolist()))
+
+    def __len__(self):
+        return len(self.x)
+
+    def update(self):
+        self.brightness += self.change * self.rng.integers(1, 4, len(self.x), dtype=np.int32)
+        top = self.brightness >= self.hi
+        self.brightness[top] = self.hi
+        self.change[top] = -1
+        bottom = self.brightness <= self.lo
+        self.brightness[bottom] = self.lo
+        self.change[bottom] = 1
+
+    def draw(self, surface):
+        index = (self.radius - self._r0) * self._levels + (self.brightness - self.lo)
+        table = self._table
+        surface.blits(zip([table[i] for i in index.tolist()], self._pos), doreturn=False)
@@ -1,15 +1,25 @@
+import time
+_T0 = time.perf_counter()  # mốc đo thời gian từ lúc import tới khung hình đầu tiên
+
+import os
+# khi xuất video ra stdout, lời chào của pygame sẽ lẫn vào luồng khung hình
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
 import pygame
-import random
 import sys
-import os
+import argparse
 
+import numpy as np
 
-pygame.init()
+import frame_export
+import gameloop
+import particles
+import text_cache
+import timeline
 
 
 WIDTH, HEIGHT = 1920, 1080
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Hiệu ứng mưa rơi + sao phát sáng + font tiếng Việt")
+CAPTION = "Hiệu ứng mưa rơi + sao phát sáng + font tiếng Việt"
 
 
 BLACK = (0, 0, 0)
@@ -17,156 +27,139 @@ WHITE = (255, 255, 255)
 RAIN_COLOR = (0, 200, 255)
 
 
-font_path = os.path.join("fonts", "NotoSans-Regular.ttf")
-if not os.path.exists(font_path):
-    
-    font_path = None
+FONT_PATH = os.path.join("fonts", "NotoSans-Regular.ttf")
 
-font = pygame.font.Font(font_path, 40)
-name_font = pygame.font.Font(font_path, 20)
-
-
-custom_texts = [
-    ("trai tim cung biet dau .", 200),
-    ("trai tim cung biet dau ..?", 200),
-    ("trai trai trai trai tim cung biet dau .", 150),
-    ("trai , trai trai tim cung biet dau", 150,500),
-    ("trai tim cung biet dau ,",200,150),
-    ('co quen di nhung ngay thang doi ta co nhau', 150),
-    ('nuoc mat kia cu roi ,',200,100),
-    ('trong tim dang gia buot ,',100,10),
-    ('khuon mat ra roi .',100,100),
-]
+# lời bài hát: mỗi dòng một câu, định dạng xem timeline.py
+LYRICS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lyrics.jsonl")
 
 user_name = "nhd"
 
-index = 0
-words = custom_texts[index][0].split()
-typing_speed = custom_texts[index][1]
-current_text = ""
-word_index = 0
-last_word_time = pygame.time.get_ticks()
-finished_typing = False
-delay_after_finish = 100
-
 RAINBOW_COLORS = [
     (255, 0, 0), (255, 127, 0), (255, 255, 0),
     (0, 255, 0), (0, 0, 255), (75, 0, 130),
     (148, 0, 211)
 ]
-color_index = 0
-next_color_index = 1
-transition_progress = 0.0
-transition_speed = 0.01
-
-class Raindrop:
-    def __init__(self):
-        self.x = random.randint(0, WIDTH)
-        self.y = random.randint(-HEIGHT, 0)
-        self.length = random.randint(15, 30)  # vệt mưa dài hơn
-        self.speed = random.randint(4, 10)
-
-    def fall(self):
-        self.y += self.speed
-        if self.y > HEIGHT:
-            self.y = random.randint(-20, -5)
-            self.x = random.randint(0, WIDTH)
-
-    def draw(self, surface):
-        pygame.draw.line(surface, RAIN_COLOR, (self.x, self.y), (self.x, self.y + self.length), 2)
-
-
-class Star:
-    def __init__(self):
-        self.x = random.randint(0, WIDTH)
-        self.y = random.randint(0, HEIGHT // 2)
-        self.radius = random.randint(1, 3)
-        self.brightness = random.randint(100, 255)
-        self.change = random.choice([-1, 1])
-
-    def twinkle(self):
-        self.brightness += self.change * random.randint(1, 3)
-        if self.brightness >= 255:
-            self.brightness = 255
-            self.change = -1
-        elif self.brightness <= 100:
-            self.brightness = 100
-            self.change = 1
-
-    def draw(self, surface):
-        color = (self.brightness, self.brightness, self.brightness)
-        pygame.draw.circle(surface, color, (self.x, self.y), self.radius)
-
-
-rain = [Raindrop() for _ in range(300)]
-stars = [Star() for _ in range(80)]
-clock = pygame.time.Clock()
-
-def lerp_color(c1, c2, t):
-    return (
-        int(c1[0] + (c2[0] - c1[0]) * t),
-        int(c1[1] + (c2[1] - c1[1]) * t),
-        int(c1[2] + (c2[2] - c1[2]) * t),
-    )
-
-
-while True:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-
-    screen.fill(BLACK)
-
-    
-    for star in stars:
-        star.twinkle()
-        star.draw(screen)
-
-    
-    for drop in rain:
-        drop.fall()
-        drop.draw(screen)
-
-    now = pygame.time.get_ticks()
-
-    
-    if not finished_typing and now - last_word_time > typing_speed:
-        if word_index < len(words):
-            current_text += (" " if current_text else "") + words[word_index]
-            word_index += 1
-            last_word_time = now
-        else:
-            finished_typing = True
-            last_word_time = now
-
-    if finished_typing and now - last_word_time > delay_after_finish:
-        index = (index + 1) % len(custom_texts)
-        words = custom_texts[index][0].split()
-        typing_speed = custom_texts[index][1]
-        current_text = ""
-        word_index = 0
-        finished_typing = False
-        last_word_time = now
-
-    
-    text_surface = font.render(current_text, True, WHITE)
-    text_rect = text_surface.get_rect(center=(WIDTH // 2, HEIGHT // 2))
-    screen.blit(text_surface, text_rect)
-
-    
-    transition_progress += transition_speed
-    if transition_progress >= 1.0:
-        transition_progress = 0.0
-        color_index = next_color_index
-        next_color_index = (next_color_index + 1) % len(RAINBOW_COLORS)
-
-    current_color = lerp_color(RAINBOW_COLORS[color_index], RAINBOW_COLORS[next_color_index], transition_progress)
-
-    name_surface = name_font.render(user_name, True, current_color)
-    name_surface.set_alpha(120)
-    name_rect = name_surface.get_rect(center=(WIDTH // 2, HEIGHT - 30))
-    screen.blit(name_surface, name_rect)
-
-    pygame.display.flip()
-    clock.tick(60)
+TRANSITION_SPEED = 0.01  # mỗi khung hình
+
+RAIN_DROPS = 300
+STARS = 80
+FPS = 60
+
+
+def load_font(size):
+    if not pygame.font.get_init():
+        pygame.font.init()
+    font_path = FONT_PATH if os.path.exists(FONT_PATH) else None
+    return pygame.font.Font(font_path, size)
+
+
+class RainEffect:
+    """Scene mưa + sao + lời chạy chữ + tên đổi màu, chạy bằng gameloop.
+
+    Mỗi update(dt) là một bước 1 / FPS; lời bài hát chạy theo thời gian của scene
+    (tổng các dt), nên chạy cửa sổ hay xuất video đều cùng một nhịp.
+    """
+
+    step = 1 / FPS
+    active = True
+
+    def __init__(self, lyrics_path=LYRICS_PATH, seed=None):
+        font = load_font(40)
+        name_font = load_font(20)
+        rng = np.random.default_rng(seed)
+        self.running = True
+        self.dirty = True
+        self.time = 0.0
+        self.rain = particles.RainField(RAIN_DROPS, WIDTH, HEIGHT, RAIN_COLOR, rng)
+        self.stars = particles.StarField(STARS, WIDTH, HEIGHT, rng)
+        self.lyrics = timeline.LyricPlayer(timeline.iter_timeline(lyrics_path), font,
+                                           (WIDTH // 2, HEIGHT // 2), clock=lambda: self.time)
+        # tên chỉ đổi màu theo bước -> render một lần rồi blit lại
+        self.name_surfaces = text_cache.TintTable(name_font, user_name, RAINBOW_COLORS, steps=32, alpha=120)
+        self.color_index = 0
+        self.next_color_index = 1
+        self.transition_progress = 0.0
+
+    def handle_event(self, event):
+        pass
+
+    def update(self, dt):
+        self.time += dt
+        self.stars.update()
+        self.rain.update()
+        self.lyrics.update(self.time)
+
+        self.transition_progress += TRANSITION_SPEED
+        if self.transition_progress >= 1.0:
+            self.transition_progress = 0.0
+            self.color_index = self.next_color_index
+            self.next_color_index = (self.next_color_index + 1) % len(RAINBOW_COLORS)
+        self.dirty = True
+
+    def render(self, surface, alpha=0.0):
+        surface.fill(BLACK)
+        self.stars.draw(surface)
+        self.rain.draw(surface)
+        self.lyrics.draw(surface)
+
+        name_surface = self.name_surfaces.get(self.color_index, self.next_color_index, self.transition_progress)
+        name_rect = name_surface.get_rect(center=(WIDTH // 2, HEIGHT - 30))
+        surface.blit(name_surface, name_rect)
+        self.dirty = False
+
+    def close(self):
+        self.lyrics.close()
+
+
+def main():
+    # mở cửa sổ trước, rồi mới nạp font / dựng hiệu ứng
+    gameloop.open_display((WIDTH, HEIGHT), CAPTION)
+    effect = RainEffect()
+    try:
+        gameloop.run(effect, (WIDTH, HEIGHT), CAPTION, fps=FPS, started=_T0)
+    finally:
+        effect.close()
+    pygame.quit()
+
+
+def export(target, duration, fps=FPS, pixel_format="rgb0", seed=None):
+    """Dựng hiệu ứng không cần cửa sổ, nhanh nhất có thể.
+
+    Mô phỏng chạy qua gameloop.run_headless theo bước cố định 1 / FPS (mưa, sao, màu tên
+    đều tính theo bước); `fps` chỉ là tần số lấy mẫu khung hình từ mô phỏng đó, nên tốc độ
+    hiệu ứng không đổi theo fps (fps > FPS thì có khung lặp lại, fps < FPS thì bỏ bớt bước).
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    pygame.display.init()
+    effect = RainEffect(seed=seed)
+    exporter = frame_export.FrameExporter((WIDTH, HEIGHT), target, pixel_format)
+    frames = int(duration * fps)
+    started = time.perf_counter()
+    try:
+        gameloop.run_headless(effect, frames, fps, surface=exporter.acquire, on_frame=exporter.submit)
+    finally:
+        exporter.close()
+        effect.close()
+    elapsed = time.perf_counter() - started
+    print(f"{frames} khung {WIDTH}x{HEIGHT} {pixel_format} @ {fps} fps trong {elapsed:.1f}s "
+          f"({duration / elapsed if elapsed else 0:.1f}x thời gian thực)", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=CAPTION)
+    parser.add_argument("--export", metavar="TARGET",
+                        help="xuất khung hình thay vì mở cửa sổ: '-' (stdout), thư mục, hoặc file raw")
+    parser.add_argument("--duration", type=float, default=10.0, help="số giây cần xuất (mặc định 10)")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help=f"số khung mỗi giây của video; hiệu ứng vẫn chạy ở {FPS} bước/giây")
+    parser.add_argument("--format", choices=frame_export.PIXEL_FORMATS, default="rgb0")
+    parser.add_argument("--seed", type=int, default=None, help="seed cho mưa / sao")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.export:
+        export(args.export, args.duration, args.fps, args.format, args.seed)
+    else:
+        main()
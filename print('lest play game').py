@@ -3,11 +3,16 @@
 # Lưu file này bằng UTF-8. Chạy: python snake_game.py
 # Cài pygame nếu chưa có: pip install pygame
 
+import time
+_T0 = time.perf_counter()  # mốc đo thời gian từ lúc import tới khung hình đầu tiên
+
 import pygame
 import random
 import sys
+from collections import deque
 
-pygame.init()
+import fonts
+import gameloop
 
 # --- Cấu hình ---
 WIDTH, HEIGHT = 640, 480
@@ -16,6 +21,9 @@ COLUMNS = WIDTH // CELL_SIZE
 ROWS = HEIGHT // CELL_SIZE
 FPS_START = 15  # tăng tốc độ ban đầu để phản hồi nhanh hơn
 FPS_INCREMENT = 0.7  # tăng tốc nhanh hơn mỗi khi ăn mồi
+RENDER_FPS = 60  # tốc độ vẽ / đọc phím, tách khỏi tốc độ rắn (game.fps)
+MAX_QUEUED_TURNS = 3  # số lần rẽ được xếp hàng chờ các bước tiếp theo
+MAX_VACATED = 8  # số ô đuôi vừa rời đi được nhớ cho renderer; nhiều bước hơn thì vẽ lại toàn bộ
 
 # Màu sắc (RGB)
 WHITE = (255, 255, 255)
@@ -25,14 +33,19 @@ GREEN = (40, 180, 40)
 DARK_GREEN = (20, 120, 20)
 GRAY = (80, 80, 80)
 
-# Font
-FONT_SMALL = pygame.font.SysFont(None, 24)
-FONT_BIG = pygame.font.SysFont(None, 48)
+CAPTION = 'Rắn săn mồi - Snake'
+
+# Font chỉ tạo trong init_fonts(), để Snake/Food/Game dùng được
+# khi không có màn hình (bot, mô phỏng hàng loạt)
+FONT_SMALL = None
+FONT_BIG = None
 
-# Khởi tạo cửa sổ
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption('Rắn săn mồi - Snake')
-clock = pygame.time.Clock()
+
+def init_fonts():
+    global FONT_SMALL, FONT_BIG
+    if FONT_SMALL is None:
+        FONT_SMALL = fonts.sys_font(None, 24)
+        FONT_BIG = fonts.sys_font(None, 48)
 
 
 def draw_text(surface, text, font, color, pos):
@@ -40,63 +53,138 @@ def draw_text(surface, text, font, color, pos):
     surface.blit(img, pos)
 
 
+class FreeCells:
+    """Tập các ô trống (chỉ số x + y * COLUMNS): thêm, xóa và chọn ngẫu nhiên đều O(1).
+
+    `cells` chứa các ô trống theo thứ tự bất kỳ, `slot[i]` là vị trí của ô i trong `cells`
+    (-1 nếu ô đang bị chiếm). Xóa bằng cách đổi chỗ với phần tử cuối rồi pop.
+    """
+
+    def __init__(self, size):
+        self.cells = list(range(size))
+        self.slot = list(range(size))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def add(self, i):
+        self.slot[i] = len(self.cells)
+        self.cells.append(i)
+
+    def remove(self, i):
+        k = self.slot[i]
+        last = self.cells.pop()
+        if last != i:
+            self.cells[k] = last
+            self.slot[last] = k
+        self.slot[i] = -1
+
+    def choice(self, rng=random):
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
+
+
 class Snake:
-    def __init__(self):
-        self.positions = [(COLUMNS // 2, ROWS // 2),
-                          (COLUMNS // 2 - 1, ROWS // 2),
-                          (COLUMNS // 2 - 2, ROWS // 2)]
+    def __init__(self, columns=COLUMNS, rows=ROWS):
+        # kích thước bàn (ô); mặc định bằng cửa sổ, bot / mô phỏng có thể dùng bàn khác
+        self.columns = columns
+        self.rows = rows
+        self.positions = deque([(columns // 2, rows // 2),
+                                (columns // 2 - 1, rows // 2),
+                                (columns // 2 - 2, rows // 2)])
+        # số đốt rắn trên mỗi ô (chỉ số x + y * columns), cập nhật khi thêm đầu / bỏ đuôi
+        self.occupancy = bytearray(columns * rows)
+        self.free = FreeCells(columns * rows)
+        for x, y in self.positions:
+            self.occupancy[x + y * columns] += 1
+            self.free.remove(x + y * columns)
         self.direction = (1, 0)
-        self.next_direction = (1, 0)
+        # hàng đợi rẽ: mỗi bước dùng một lần rẽ, nên hai phím bấm nhanh không đè nhau
+        self.turns = deque()
         self.grow_pending = 0
+        self.moves = 0          # số bước đã đi, để renderer biết có gì thay đổi
+        # các ô đuôi đã rời đi từ lần renderer lấy gần nhất (bước rắn dài ra thì không có ô nào)
+        self.vacated = deque(maxlen=MAX_VACATED)
 
     def head(self):
         return self.positions[0]
 
+    def occupied(self, pos):
+        return self.occupancy[pos[0] + pos[1] * self.columns] > 0
+
     def move(self):
-        self.direction = self.next_direction  # áp dụng hướng mới sớm hơn để giảm delay
+        if self.turns:
+            self.direction = self.turns.popleft()
         dx, dy = self.direction
         head_x, head_y = self.head()
-        new_head = ((head_x + dx) % COLUMNS, (head_y + dy) % ROWS)
-        self.positions.insert(0, new_head)
+        columns = self.columns
+        new_head = ((head_x + dx) % columns, (head_y + dy) % self.rows)
+        self.moves += 1
         if self.grow_pending > 0:
             self.grow_pending -= 1
         else:
-            self.positions.pop()
+            # đuôi rời ô trong cùng tick -> đầu được phép đi vào ô đuôi cũ
+            tail_x, tail_y = self.positions.pop()
+            self.vacated.append((tail_x, tail_y))
+            i = tail_x + tail_y * columns
+            self.occupancy[i] -= 1
+            if not self.occupancy[i]:
+                self.free.add(i)
+        self.positions.appendleft(new_head)
+        i = new_head[0] + new_head[1] * columns
+        if not self.occupancy[i]:
+            self.free.remove(i)
+        self.occupancy[i] += 1
 
     def change_direction(self, new_dir):
-        if (new_dir[0] * -1, new_dir[1] * -1) != self.direction:
-            self.next_direction = new_dir
+        # so với hướng cuối cùng trong hàng đợi (hướng rắn sẽ có khi tới lượt lần rẽ này)
+        last = self.turns[-1] if self.turns else self.direction
+        if new_dir == last or (new_dir[0] * -1, new_dir[1] * -1) == last:
+            return
+        if len(self.turns) < MAX_QUEUED_TURNS:
+            self.turns.append(new_dir)
 
     def grow(self, amount=1):
         self.grow_pending += amount
 
     def collides_with_self(self):
-        return self.head() in self.positions[1:]
+        head_x, head_y = self.head()
+        return self.occupancy[head_x + head_y * self.columns] > 1
 
 
 class Food:
-    def __init__(self, snake_positions):
-        self.position = self.random_pos(snake_positions)
+    def __init__(self, snake, rng=random):
+        self.rng = rng
+        self.position = self.random_pos(snake)
 
-    def random_pos(self, snake_positions):
-        choices = [(x, y) for x in range(COLUMNS) for y in range(ROWS) if (x, y) not in snake_positions]
-        return random.choice(choices) if choices else None
+    def random_pos(self, snake):
+        # chọn trực tiếp trong tập ô trống của rắn; None khi bàn đã kín
+        i = snake.free.choice(self.rng)
+        if i is None:
+            return None
+        return (i % snake.columns, i // snake.columns)
 
-    def respawn(self, snake_positions):
-        self.position = self.random_pos(snake_positions)
+    def respawn(self, snake):
+        self.position = self.random_pos(snake)
 
 
 class Game:
-    def __init__(self):
-        self.snake = Snake()
-        self.food = Food(self.snake.positions)
+    def __init__(self, rng=random, size=None):
+        # rng: random.Random(seed) để một ván chơi lặp lại được (dùng cho bot / mô phỏng)
+        # size: (cột, hàng) của bàn, mặc định (COLUMNS, ROWS)
+        self.rng = rng
+        self.size = size
+        self.snake = Snake(*size) if size else Snake()
+        self.food = Food(self.snake, rng)
         self.score = 0
         self.fps = FPS_START
         self.running = True
         self.paused = False
+        self.death_cause = None  # "self" (tự cắn) hoặc "board_full" (hết chỗ cho mồi)
 
     def reset(self):
-        self.__init__()
+        self.__init__(self.rng, self.size)
 
     def update(self):
         if self.paused or not self.running:
@@ -106,16 +194,18 @@ class Game:
 
         if self.snake.collides_with_self():
             self.running = False
+            self.death_cause = "self"
             return
 
         if self.snake.head() == self.food.position:
             self.score += 1
             self.snake.grow(1)
-            self.food.respawn(self.snake.positions)
+            self.food.respawn(self.snake)
             self.fps += FPS_INCREMENT
 
         if self.food.position is None:
             self.running = False
+            self.death_cause = "board_full"
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -131,62 +221,214 @@ class Game:
                 self.paused = not self.paused
             elif event.key == pygame.K_r:
                 self.reset()
-            elif event.key == pygame.K_ESCAPE:
-                pygame.quit()
-                sys.exit()
 
-    def draw_grid(self):
+
+def cell_rect(pos):
+    return pygame.Rect(pos[0] * CELL_SIZE, pos[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+
+class Renderer:
+    """Vẽ game lên màn hình, chỉ cập nhật những ô thay đổi sau mỗi bước.
+
+    Lưới được vẽ sẵn một lần vào `background`; mỗi bước chỉ xóa ô đuôi vừa rời đi,
+    vẽ lại đầu cũ thành thân, vẽ đầu mới và mồi mới. Chữ HUD được cache tới khi giá trị
+    đổi. draw() trả về danh sách vùng cần cập nhật cho pygame.display.update().
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.full_rect = surface.get_rect()
+        self.background = pygame.Surface(surface.get_size())
+        self.background.fill(BLACK)
         for x in range(0, WIDTH, CELL_SIZE):
-            pygame.draw.line(screen, GRAY, (x, 0), (x, HEIGHT))
+            pygame.draw.line(self.background, GRAY, (x, 0), (x, HEIGHT))
         for y in range(0, HEIGHT, CELL_SIZE):
-            pygame.draw.line(screen, GRAY, (0, y), (WIDTH, y))
-
-    def draw(self):
-        screen.fill(BLACK)
-        self.draw_grid()
-
-        if self.food.position:
-            fx, fy = self.food.position
-            rect = pygame.Rect(fx * CELL_SIZE, fy * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            pygame.draw.rect(screen, RED, rect)
-
-        for i, (x, y) in enumerate(self.snake.positions):
-            rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-            if i == 0:
-                pygame.draw.rect(screen, WHITE, rect)
-                inner = rect.inflate(-6, -6)
-                pygame.draw.rect(screen, DARK_GREEN, inner)
-            else:
-                pygame.draw.rect(screen, GREEN, rect)
-                inner = rect.inflate(-6, -6)
-                pygame.draw.rect(screen, BLACK, inner)
-
-        draw_text(screen, f"Điểm: {self.score}", FONT_SMALL, WHITE, (8, 8))
-        draw_text(screen, f"Tốc độ: {self.fps:.1f}", FONT_SMALL, WHITE, (8, 30))
-
-        if self.paused:
-            draw_text(screen, "PAUSED - Nhấn 'P' để tiếp tục", FONT_BIG, WHITE, (WIDTH // 6, HEIGHT // 2 - 40))
-        if not self.running:
+            pygame.draw.line(self.background, GRAY, (0, y), (WIDTH, y))
+        self._text_cache = {}
+        self._hud_rect = pygame.Rect(0, 0, 0, 0)
+        self._hud_values = None
+        self._snake = None
+        self._moves = 0
+        self._food = None
+        self._mode = None
+        self._head_rect = None
+        self.invalidate()
+
+    def invalidate(self):
+        """Buộc lần draw() tiếp theo vẽ lại toàn bộ màn hình."""
+        self._snake = None
+
+    def text(self, text, font, color):
+        key = (text, font, color)
+        img = self._text_cache.get(key)
+        if img is None:
+            if len(self._text_cache) > 64:
+                self._text_cache.clear()
+            img = self._text_cache[key] = font.render(text, True, color)
+        return img
+
+    def draw_segment(self, rect, head):
+        if head:
+            pygame.draw.rect(self.surface, WHITE, rect)
+            pygame.draw.rect(self.surface, DARK_GREEN, rect.inflate(-6, -6))
+        else:
+            pygame.draw.rect(self.surface, GREEN, rect)
+            pygame.draw.rect(self.surface, BLACK, rect.inflate(-6, -6))
+
+    def draw_cell(self, pos, game):
+        rect = cell_rect(pos)
+        snake = game.snake
+        head = pos == snake.head()
+        if snake.occupied(pos) and not (head and self._head_rect):
+            self.draw_segment(rect, head)
+        else:
+            self.surface.blit(self.background, rect, rect)
+            if pos == game.food.position:
+                pygame.draw.rect(self.surface, RED, rect)
+        return rect
+
+    def draw_hud(self, game):
+        score = self.text(f"Điểm: {game.score}", FONT_SMALL, WHITE)
+        speed = self.text(f"Tốc độ: {game.fps:.1f}", FONT_SMALL, WHITE)
+        self.surface.blit(score, (8, 8))
+        self.surface.blit(speed, (8, 30))
+        self._hud_values = (game.score, game.fps)
+        return score.get_rect(topleft=(8, 8)).union(speed.get_rect(topleft=(8, 30)))
+
+    def repaint_hud(self, game):
+        # xóa vùng HUD cũ, vẽ lại các ô nằm dưới nó rồi vẽ chữ lên trên
+        old = self._hud_rect
+        x0, y0 = old.left // CELL_SIZE, old.top // CELL_SIZE
+        x1 = min((old.right - 1) // CELL_SIZE, COLUMNS - 1)
+        y1 = min((old.bottom - 1) // CELL_SIZE, ROWS - 1)
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                self.draw_cell((x, y), game)
+        # các ô vẽ lại phủ rộng hơn chữ: đầu nội suy chạm vào đâu trong đó cũng phải vẽ lại
+        cells = pygame.Rect(x0 * CELL_SIZE, y0 * CELL_SIZE,
+                            (x1 - x0 + 1) * CELL_SIZE, (y1 - y0 + 1) * CELL_SIZE)
+        if self._head_rect and self._head_rect.colliderect(cells):
+            self.draw_segment(self._head_rect, True)
+        self._hud_rect = self.draw_hud(game)
+        return cells.union(self._hud_rect)
+
+    def draw_full(self, game):
+        self.surface.blit(self.background, (0, 0))
+        if game.food.position:
+            pygame.draw.rect(self.surface, RED, cell_rect(game.food.position))
+        for i, pos in enumerate(game.snake.positions):
+            if i or not self._head_rect:
+                self.draw_segment(cell_rect(pos), i == 0)
+        if self._head_rect:
+            self.draw_segment(self._head_rect, True)
+        self._hud_rect = self.draw_hud(game)
+
+        if game.paused:
+            draw_text(self.surface, "PAUSED - Nhấn 'P' để tiếp tục", FONT_BIG, WHITE, (WIDTH // 6, HEIGHT // 2 - 40))
+        if not game.running:
             msg = "Bạn thua! (Rắn tự cắn hoặc hết chỗ cho mồi)"
-            draw_text(screen, msg, FONT_BIG, RED, (20, HEIGHT // 2 - 40))
-            draw_text(screen, "Nhấn R để chơi lại, ESC để thoát", FONT_SMALL, WHITE, (WIDTH // 4, HEIGHT // 2 + 20))
+            draw_text(self.surface, msg, FONT_BIG, RED, (20, HEIGHT // 2 - 40))
+            draw_text(self.surface, "Nhấn R để chơi lại, ESC để thoát", FONT_SMALL, WHITE, (WIDTH // 4, HEIGHT // 2 + 20))
+        return [self.full_rect]
+
+    def interpolated_head(self, game, alpha):
+        """Ô đầu rắn trượt dần từ ô cũ sang ô mới theo alpha (0..1) giữa hai bước."""
+        snake = game.snake
+        if alpha >= 1 or game.paused or not game.running or len(snake.positions) < 2:
+            return None
+        (hx, hy), (px, py) = snake.positions[0], snake.positions[1]
+        dx, dy = hx - px, hy - py
+        if abs(dx) + abs(dy) != 1:  # đi xuyên tường: không nội suy
+            return None
+        return cell_rect((px, py)).move(int(dx * CELL_SIZE * alpha), int(dy * CELL_SIZE * alpha))
+
+    def draw(self, game, alpha=1.0):
+        snake = game.snake
+        mode = (game.paused, game.running)
+        steps = snake.moves - self._moves
+        full = snake is not self._snake or mode != self._mode or steps > MAX_VACATED
+        self._snake, self._mode, self._moves = snake, mode, snake.moves
+        vacated = list(snake.vacated)
+        snake.vacated.clear()
+        if full:
+            self._food = game.food.position
+            self._head_rect = self.interpolated_head(game, alpha)
+            return self.draw_full(game)
+
+        dirty = []
+        head_rect = self.interpolated_head(game, alpha)
+        if steps or head_rect or self._head_rect:
+            # nhiều bước trong một khung (rắn nhanh hơn RENDER_FPS): xóa mọi ô đuôi đã rời,
+            # vẽ lại các đầu cũ thành thân, chi phí theo số bước chứ không theo độ dài rắn
+            cells = set(vacated)
+            for i in range(1, min(max(steps, 1), len(snake.positions) - 1) + 1):
+                cells.add(snake.positions[i])
+            cells.add(snake.head())
+            if self._head_rect:
+                # đầu nội suy lần trước nằm vắt qua hai ô, có thể là ô nay đã thành thân
+                old = self._head_rect
+                for y in range(old.top // CELL_SIZE, (old.bottom - 1) // CELL_SIZE + 1):
+                    for x in range(old.left // CELL_SIZE, (old.right - 1) // CELL_SIZE + 1):
+                        cells.add((x, y))
+            self._head_rect = head_rect
+            for pos in cells:
+                dirty.append(self.draw_cell(pos, game))
+            if head_rect:
+                self.draw_segment(head_rect, True)
+        if game.food.position != self._food:
+            self._food = game.food.position
+            if self._food is not None:
+                dirty.append(self.draw_cell(self._food, game))
+        if self._hud_values != (game.score, game.fps) or self._hud_rect.collidelist(dirty) != -1:
+            dirty.append(self.repaint_hud(game))
+        return dirty
+
+
+class SnakeScene:
+    """Game + Renderer cho gameloop: rắn đi theo bước cố định 1 / game.fps, vẽ ở RENDER_FPS."""
+
+    def __init__(self, surface, game=None):
+        init_fonts()
+        self.game = game or Game()
+        self.renderer = Renderer(surface)
+        self.running = True
+        self.dirty = True
+
+    @property
+    def step(self):
+        return 1 / self.game.fps
+
+    @property
+    def active(self):
+        return self.game.running and not self.game.paused
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.running = False
+            return
+        self.game.handle_event(event)
+        self.dirty = True
+
+    def update(self, dt):
+        self.game.update()
+
+    def invalidate(self):
+        self.renderer.invalidate()
 
-        pygame.display.flip()
+    def render(self, surface, alpha):
+        dirty = self.renderer.draw(self.game, alpha)
+        # đang chạy thì đầu rắn trượt theo alpha nên khung nào cũng vẽ
+        self.dirty = self.active
+        return dirty
 
 
 def main_loop():
-    game = Game()
-    while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            game.handle_event(event)
-
-        game.update()
-        game.draw()
-
-        clock.tick(game.fps)
+    # mở cửa sổ trước, rồi mới nạp font / dựng scene
+    screen = gameloop.open_display((WIDTH, HEIGHT), CAPTION)
+    scene = SnakeScene(screen)
+    gameloop.run(scene, (WIDTH, HEIGHT), CAPTION, fps=RENDER_FPS, started=_T0)
+    pygame.quit()
+    sys.exit()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,308 @@
+# snake_sim.py
+# Mô phỏng hàng loạt game rắn không cần màn hình, có bot tự chơi.
+#
+#   python snake_sim.py --bot astar --games 1000 --workers 8
+#   python snake_sim.py --bot hamilton --size 16x16 --games 200
+#
+# Bot:
+#   greedy   - BFS tới mồi theo đường ngắn nhất
+#   astar    - A* tới mồi (khoảng cách Manhattan trên bàn cuộn tròn)
+#   hamilton - đi theo một chu trình Hamilton cố định, không bao giờ tự cắn
+# Khi không tìm được đường tới mồi, greedy/astar chọn nước đi an toàn có vùng trống lớn nhất.
+#
+# Bot dùng trực tiếp mảng occupancy của Snake và các buffer cấp phát sẵn
+# (hàng đợi, parent, dấu "đã thăm" theo thế hệ, heap của A* chứa số nguyên) nên mỗi bước
+# không tạo list tuple mới.
+
+import argparse
+import heapq
+import os
+import random
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import game_scripts
+
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class GridBot:
+    """Phần chung: bảng ô kề (có cuộn tròn) và buffer tìm đường cấp phát một lần."""
+
+    def __init__(self, columns, rows):
+        self.w = w = columns
+        self.h = h = rows
+        n = w * h
+        # neighbors[4 * i + d] = ô kề của ô i theo DIRECTIONS[d]
+        self.neighbors = array('i', bytes(4 * 4 * n))
+        for i in range(n):
+            x, y = i % w, i // w
+            for d, (dx, dy) in enumerate(DIRECTIONS):
+                self.neighbors[4 * i + d] = (x + dx) % w + ((y + dy) % h) * w
+        self.parent = array('i', bytes(4 * n))
+        self.seen = array('I', bytes(4 * n))
+        self.queue = array('i', bytes(4 * n))
+        self.stamp = 0
+
+    def _obstacles(self, snake):
+        occupancy = snake.occupancy
+        tail = snake.positions[-1]
+        # đuôi rời ô ở bước tới nếu rắn không đang dài ra
+        free_tail = tail[0] + tail[1] * self.w if snake.grow_pending == 0 else -1
+        return occupancy, free_tail
+
+    def _next_stamp(self):
+        self.stamp += 1
+        if self.stamp >= 0xFFFFFFFF:
+            self.seen = array('I', bytes(len(self.seen) * 4))
+            self.stamp = 1
+        return self.stamp
+
+    def first_step(self, start, goal):
+        """Lùi theo parent từ goal về start, trả về chỉ số hướng đi đầu tiên."""
+        i = goal
+        while self.parent[i] != start:
+            i = self.parent[i]
+        base = 4 * start
+        for d in range(4):
+            if self.neighbors[base + d] == i:
+                return d
+        raise AssertionError("parent chain does not reach start")
+
+    def bfs(self, start, goal, occupancy, free_tail):
+        """BFS từ start. Trả về True nếu tới được goal; nếu goal = -1 thì trả về số ô tới được."""
+        stamp = self._next_stamp()
+        seen, parent, queue, nb = self.seen, self.parent, self.queue, self.neighbors
+        seen[start] = stamp
+        head = tail = 0
+        queue[tail] = start
+        tail += 1
+        while head < tail:
+            i = queue[head]
+            head += 1
+            base = 4 * i
+            for d in range(4):
+                j = nb[base + d]
+                if seen[j] == stamp or (occupancy[j] and j != free_tail):
+                    continue
+                seen[j] = stamp
+                parent[j] = i
+                if j == goal:
+                    return True
+                queue[tail] = j
+                tail += 1
+        return False if goal >= 0 else tail
+
+    def safest_move(self, head, occupancy, free_tail):
+        """Nước đi không chết ngay có vùng trống tới được lớn nhất (None nếu không có)."""
+        best, best_area = None, -1
+        for d in range(4):
+            j = self.neighbors[4 * head + d]
+            if occupancy[j] and j != free_tail:
+                continue
+            area = self.bfs(j, -1, occupancy, free_tail)
+            if area > best_area:
+                best, best_area = d, area
+        return best
+
+    def choose(self, game):
+        raise NotImplementedError
+
+
+class GreedyBFSBot(GridBot):
+    def choose(self, game):
+        snake = game.snake
+        hx, hy = snake.head()
+        head = hx + hy * self.w
+        occupancy, free_tail = self._obstacles(snake)
+        d = None
+        if game.food.position is not None:
+            fx, fy = game.food.position
+            goal = fx + fy * self.w
+            if self.bfs(head, goal, occupancy, free_tail):
+                d = self.first_step(head, goal)
+        if d is None:
+            d = self.safest_move(head, occupancy, free_tail)
+        return DIRECTIONS[d] if d is not None else snake.direction
+
+
+class AStarBot(GridBot):
+    def __init__(self, columns, rows):
+        super().__init__(columns, rows)
+        n = self.w * self.h
+        self.g = array('i', bytes(4 * n))
+        # mục trong heap là một số nguyên ghép (f, g, ô) theo từng nhóm `bits` bit: so sánh
+        # như tuple (f, g, ô) nhưng không tạo tuple cho mỗi ô được đẩy vào
+        self.bits = n.bit_length()
+        self.mask = (1 << self.bits) - 1
+        self.heap = []
+
+    def _distance(self, i, goal):
+        dx = abs(i % self.w - goal % self.w)
+        dy = abs(i // self.w - goal // self.w)
+        return min(dx, self.w - dx) + min(dy, self.h - dy)
+
+    def astar(self, start, goal, occupancy, free_tail):
+        stamp = self._next_stamp()
+        seen, parent, g, nb = self.seen, self.parent, self.g, self.neighbors
+        bits, mask = self.bits, self.mask
+        seen[start] = stamp
+        g[start] = 0
+        heap = self.heap
+        heap.clear()
+        heap.append(self._distance(start, goal) << bits << bits | start)
+        while heap:
+            key = heapq.heappop(heap)
+            i = key & mask
+            if i == goal:
+                return True
+            cost = key >> bits & mask
+            if cost > g[i]:
+                continue
+            base = 4 * i
+            for d in range(4):
+                j = nb[base + d]
+                if occupancy[j] and j != free_tail:
+                    continue
+                c = cost + 1
+                if seen[j] == stamp and c >= g[j]:
+                    continue
+                seen[j] = stamp
+                g[j] = c
+                parent[j] = i
+                heapq.heappush(heap, ((c + self._distance(j, goal)) << bits | c) << bits | j)
+        return False
+
+    def choose(self, game):
+        snake = game.snake
+        hx, hy = snake.head()
+        head = hx + hy * self.w
+        occupancy, free_tail = self._obstacles(snake)
+        d = None
+        if game.food.position is not None:
+            fx, fy = game.food.position
+            goal = fx + fy * self.w
+            if self.astar(head, goal, occupancy, free_tail):
+                d = self.first_step(head, goal)
+        if d is None:
+            d = self.safest_move(head, occupancy, free_tail)
+        return DIRECTIONS[d] if d is not None else snake.direction
+
+
+class HamiltonBot(GridBot):
+    """Đi theo chu trình: hàng chẵn sang phải, hàng lẻ sang trái (bỏ cột 0), rồi cột 0 đi lên.
+
+    Nếu rắn khởi đầu nằm trên hàng đi ngược chiều thì dùng chu trình theo chiều ngược lại.
+    """
+
+    def __init__(self, columns, rows):
+        super().__init__(columns, rows)
+        w, h = self.w, self.h
+        if h % 2:
+            raise ValueError(f"hamilton bot needs an even number of rows, got {h}")
+        order = []
+        for y in range(h):
+            xs = range(1, w) if y % 2 == 0 else range(w - 1, 0, -1)
+            order.extend(x + y * w for x in xs)
+        order.extend(0 + y * w for y in range(h - 1, -1, -1))
+        if (h // 2) % 2:  # rắn bắt đầu ở hàng h // 2, hướng sang phải
+            order.reverse()
+        self.next_dir = array('b', bytes(w * h))
+        for k, i in enumerate(order):
+            j = order[(k + 1) % len(order)]
+            for d in range(4):
+                if self.neighbors[4 * i + d] == j:
+                    self.next_dir[i] = d
+                    break
+
+    def choose(self, game):
+        hx, hy = game.snake.head()
+        return DIRECTIONS[self.next_dir[hx + hy * self.w]]
+
+
+BOTS = {
+    "greedy": GreedyBFSBot,
+    "astar": AStarBot,
+    "hamilton": HamiltonBot,
+}
+
+
+def play_game(bot_name, seed, max_steps, size=None):
+    """Chơi một ván với bot; trả về dict kết quả (chạy được trong tiến trình con)."""
+    snake_mod = game_scripts.load("snake")
+    game = snake_mod.Game(rng=random.Random(seed), size=size)
+    bot = BOTS[bot_name](game.snake.columns, game.snake.rows)
+    steps = 0
+    while game.running and steps < max_steps:
+        game.snake.change_direction(bot.choose(game))
+        game.update()
+        steps += 1
+    return {
+        "seed": seed,
+        "steps": steps,
+        "score": game.score,
+        "length": len(game.snake.positions),
+        "cause": game.death_cause or "timeout",
+    }
+
+
+def _play_batch(args):
+    bot_name, seeds, max_steps, size = args
+    return [play_game(bot_name, seed, max_steps, size) for seed in seeds]
+
+
+def run_batch(bot_name, games, seed=0, workers=None, max_steps=20000, size=None):
+    """Chạy `games` ván (seed, seed + 1, ...) trên nhiều tiến trình và tổng hợp kết quả."""
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(seed, seed + games))
+    chunk = max(1, games // (workers * 4))
+    jobs = [(bot_name, seeds[k:k + chunk], max_steps, size) for k in range(0, games, chunk)]
+    start = time.perf_counter()
+    results = []
+    if workers == 1:
+        for job in jobs:
+            results.extend(_play_batch(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch in pool.map(_play_batch, jobs):
+                results.extend(batch)
+    elapsed = time.perf_counter() - start
+    total_steps = sum(r["steps"] for r in results)
+    return {
+        "bot": bot_name,
+        "games": len(results),
+        "elapsed": elapsed,
+        "steps_per_sec": total_steps / elapsed if elapsed else 0.0,
+        "avg_length": sum(r["length"] for r in results) / len(results) if results else 0.0,
+        "avg_score": sum(r["score"] for r in results) / len(results) if results else 0.0,
+        "causes": dict(Counter(r["cause"] for r in results)),
+        "results": results,
+    }
+
+
+def parse_size(text):
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mô phỏng game rắn với bot, không cần màn hình")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="greedy")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="seed của ván đầu tiên")
+    parser.add_argument("--workers", type=int, default=None, help="số tiến trình (mặc định: số CPU)")
+    parser.add_argument("--max-steps", type=int, default=20000, help="số bước tối đa mỗi ván")
+    parser.add_argument("--size", type=parse_size, default=None, help="kích thước bàn, ví dụ 64x48")
+    args = parser.parse_args(argv)
+
+    report = run_batch(args.bot, args.games, args.seed, args.workers, args.max_steps, args.size)
+    print(f"bot={report['bot']} games={report['games']} time={report['elapsed']:.2f}s")
+    print(f"steps/sec: {report['steps_per_sec']:.0f}")
+    print(f"avg length: {report['avg_length']:.1f}  avg score: {report['avg_score']:.1f}")
+    print("deaths: " + ", ".join(f"{cause}={n}" for cause, n in sorted(report["causes"].items())))
+
+
+if __name__ == "__main__":
+    main()
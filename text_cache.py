@@ -0,0 +1,62 @@
+# text_cache.py
+# Cache surface chữ đã render, để mỗi khung hình chỉ còn blit thay vì font.render.
+#
+#   TextCache  - surface theo nội dung chuỗi (ví dụ từng đoạn câu đang gõ dở)
+#   TintTable  - bảng surface của một chuỗi cố định với màu nội suy giữa các màu
+#                (ví dụ tên chạy màu cầu vồng), lượng tử hóa theo số bước
+
+from collections import OrderedDict
+
+
+def lerp_color(c1, c2, t):
+    return (
+        int(c1[0] + (c2[0] - c1[0]) * t),
+        int(c1[1] + (c2[1] - c1[1]) * t),
+        int(c1[2] + (c2[2] - c1[2]) * t),
+    )
+
+
+class TextCache:
+    def __init__(self, font, color, antialias=True, max_items=128):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def render(self, text):
+        surface = self._items.get(text)
+        if surface is None:
+            surface = self.font.render(text, self.antialias, self.color)
+            self._items[text] = surface
+            if len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        else:
+            self._items.move_to_end(text)
+        return surface
+
+
+class TintTable:
+    def __init__(self, font, text, colors, steps=32, alpha=None, antialias=True):
+        self.font = font
+        self.text = text
+        self.colors = colors
+        self.steps = steps
+        self.alpha = alpha
+        self.antialias = antialias
+        self._items = {}  # (chỉ số màu đầu, bước) -> surface, tạo khi cần lần đầu
+
+    def get(self, color_index, next_index, progress):
+        step = min(self.steps - 1, int(progress * self.steps))
+        key = (color_index, next_index, step)
+        surface = self._items.get(key)
+        if surface is None:
+            color = lerp_color(self.colors[color_index], self.colors[next_index], step / self.steps)
+            surface = self.font.render(self.text, self.antialias, color)
+            if self.alpha is not None:
+                surface.set_alpha(self.alpha)
+            self._items[key] = surface
+        return surface
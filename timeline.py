@@ -0,0 +1,169 @@
+# timeline.py
+# Đọc và phát file lời (timeline) cho hiệu ứng chữ gõ từng từ.
+#
+# File dạng JSON Lines, mỗi dòng một câu; dòng trống hoặc bắt đầu bằng '#' bị bỏ qua:
+#   {"text": "trai tim cung biet dau .", "speed": 200}
+#   {"text": "nuoc mat kia cu roi ,", "speed": 200, "hold": 100, "color": "#80d0ff"}
+#   {"text": "khuon mat ra roi .", "words": [300, 120, 120, 400], "effect": "fade"}
+#
+#   speed   - ms giữa hai từ (mặc định 200)
+#   words   - ms chờ trước từng từ, thay cho speed (phải đủ số từ)
+#   hold    - ms giữ câu sau khi gõ xong (mặc định 100)
+#   color   - [r, g, b] hoặc "#rrggbb" (mặc định trắng)
+#   effect  - "type": hiện từng từ (mặc định); "fade": hiện cả câu, mờ dần vào
+#
+# File được đọc dần từng dòng (không nạp cả file), và câu kế tiếp được render sẵn
+# ở một luồng nền trong lúc câu hiện tại đang chạy. Thời điểm hiện từng từ được tính
+# trước theo đồng hồ monotonic khi câu bắt đầu.
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from text_cache import TextCache
+
+DEFAULT_SPEED = 200
+DEFAULT_HOLD = 100
+DEFAULT_COLOR = (255, 255, 255)
+EFFECTS = ("type", "fade")
+
+
+def parse_color(value):
+    if value is None:
+        return DEFAULT_COLOR
+    if isinstance(value, str):
+        value = value.lstrip("#")
+        return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+    return tuple(value)
+
+
+class Line:
+    """Một câu trong timeline; thời gian tính bằng giây."""
+
+    def __init__(self, text, delays, hold, color=DEFAULT_COLOR, effect="type"):
+        self.text = text
+        self.words = text.split()
+        self.delays = delays    # giây chờ trước từng từ
+        self.hold = hold        # giây giữ câu sau khi gõ xong
+        self.color = color
+        self.effect = effect
+
+    @classmethod
+    def from_dict(cls, data):
+        text = data["text"]
+        n = len(text.split())
+        if not n:
+            raise ValueError("empty text")
+        if "words" in data:
+            delays = [ms / 1000 for ms in data["words"]]
+            if len(delays) != n:
+                raise ValueError(f"{text!r}: {len(delays)} word timings for {n} words")
+        else:
+            delays = [data.get("speed", DEFAULT_SPEED) / 1000] * n
+        effect = data.get("effect", "type")
+        if effect not in EFFECTS:
+            raise ValueError(f"{text!r}: unknown effect {effect!r}")
+        return cls(text, delays, data.get("hold", DEFAULT_HOLD) / 1000, parse_color(data.get("color")), effect)
+
+    def schedule(self, start):
+        """Thời điểm hiện từng từ và thời điểm kết thúc câu, tính từ `start`.
+
+        Giống bản cũ: sau từ cuối còn chờ thêm một nhịp rồi mới tới `hold`.
+        """
+        due = []
+        t = start
+        for delay in self.delays:
+            t += delay
+            due.append(t)
+        end = t + (self.delays[-1] if self.delays else 0) + self.hold
+        return due, end
+
+
+def iter_timeline(path, loop=True):
+    """Đọc lần lượt từng câu trong file; loop=True thì đọc lại từ đầu khi hết file."""
+    while True:
+        found = False
+        with open(path, encoding="utf-8") as f:
+            for lineno, raw in enumerate(f, 1):
+                raw = raw.strip()
+                if not raw or raw.startswith("#"):
+                    continue
+                try:
+                    line = Line.from_dict(json.loads(raw))
+                except (ValueError, KeyError) as e:
+                    raise ValueError(f"{path}:{lineno}: {e}") from None
+                found = True
+                yield line
+        if not loop or not found:
+            return
+
+
+class LyricPlayer:
+    """Phát các câu của timeline: update(now) theo lịch, draw(surface) chỉ blit surface có sẵn."""
+
+    def __init__(self, lines, font, center, clock=time.monotonic):
+        self.lines = iter(lines)
+        self.font = font
+        self.center = center
+        self.clock = clock
+        self._caches = {}  # màu -> TextCache; chỉ một luồng render dùng tại một thời điểm
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lyrics")
+        self.line = None
+        self.alpha = 255
+        first = next(self.lines, None)
+        self._start(first, self.clock(), self._prerender(first))
+
+    def _prerender(self, line):
+        """Render sẵn mọi đoạn câu (1 từ, 2 từ, ...) của `line`; thường chạy ở luồng nền."""
+        if line is None:
+            return None
+        if line.effect == "fade":
+            # surface riêng vì alpha sẽ được đổi theo từng khung hình
+            return [self.font.render(line.text, True, line.color)]
+        cache = self._caches.get(line.color)
+        if cache is None:
+            cache = self._caches[line.color] = TextCache(self.font, line.color)
+        return [cache.render(" ".join(line.words[:k])) for k in range(1, len(line.words) + 1)]
+
+    def _start(self, line, start, surfaces):
+        self.line = line
+        if line is None:
+            return
+        self.surfaces = surfaces
+        self.start = start
+        self.due, self.end = line.schedule(start)
+        self.shown = 0
+        # render câu kế tiếp ở luồng nền trong lúc câu này đang chạy
+        upcoming = next(self.lines, None)
+        self._next = (upcoming, self._executor.submit(self._prerender, upcoming))
+
+    def update(self, now=None):
+        if now is None:
+            now = self.clock()
+        while self.line is not None and now >= self.end:
+            upcoming, rendered = self._next
+            # giữ nhịp theo lịch: câu mới bắt đầu đúng lúc câu cũ kết thúc
+            self._start(upcoming, self.end, rendered.result())
+        if self.line is None:
+            return
+        due = self.due
+        while self.shown < len(due) and now >= due[self.shown]:
+            self.shown += 1
+        if self.line.effect == "fade":
+            typing = due[-1] - self.start
+            self.alpha = int(255 * min(1.0, (now - self.start) / typing)) if typing > 0 else 255
+
+    def draw(self, surface):
+        if self.line is None:
+            return
+        if self.line.effect == "fade":
+            image = self.surfaces[0]
+            image.set_alpha(self.alpha)
+        elif self.shown:
+            image = self.surfaces[self.shown - 1]
+        else:
+            return
+        surface.blit(image, image.get_rect(center=self.center))
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)